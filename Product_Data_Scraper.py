@@ -1,270 +1,2690 @@
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 from lxml import etree  # For XPath evaluation
+from lxml.cssselect import CSSSelector  # CSS selectors evaluated natively by lxml
 import pandas as pd  # For reading Excel files
-import tkinter as tk
-from tkinter import filedialog, messagebox, ttk
+try:
+    import tkinter as tk
+    from tkinter import filedialog, messagebox, ttk
+except ImportError:  # Headless Python builds; only the GUI needs Tk
+    tk = filedialog = messagebox = ttk = None
+import argparse
+import sys
 import threading
 import time
-from urllib.parse import urlparse, urljoin
+import random
+import bisect
+import cProfile
+import pstats
+from array import array
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import sqlite3
+import zlib
+import hashlib
+import json
+import os
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from collections import OrderedDict
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache, partial
+from urllib.parse import urlparse, urljoin, urlsplit, urlunsplit
 import re  # For regular expressions (CSS selector fallback)
 
+try:
+    import brotli  # noqa: F401  (lets urllib3 decode 'br' responses)
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3',
+    'Accept-Encoding': 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
 # Global flag to track if a file has been selected
 file_selected = False
 excel_file_path_global = ""
 
-def extract_link(html_content, method='xpath', selector=None, base_url=None, url=None, progress_callback=None):
+SELECTOR_FIELDS = (
+    ('product_link_selector', 'product_link_selector_type'),
+    ('family_selector', 'family_selector_type'),
+    ('image_selector', 'image_selector_type'),
+)
+
+@lru_cache(maxsize=256)
+def compile_selector(method, selector):
+    """
+    Compiles an XPath or CSS selector into a reusable lxml evaluator.
+
+    Compiled selectors are cached, so each distinct selector string is only parsed once per run.
+
+    Args:
+        method (str): 'xpath' or 'css'.
+        selector (str): The selector to compile.
+
+    Returns:
+        etree.XPath: A callable that evaluates the selector against an element
+        (CSSSelector is a subclass of etree.XPath).
+
+    Raises:
+        ValueError: If the method is unknown or the selector is not valid.
+    """
+    if method == 'xpath':
+        try:
+            return etree.XPath(selector)
+        except etree.XPathSyntaxError as e:
+            raise ValueError(f"Invalid XPath selector '{selector}': {e}") from e
+    if method == 'css':
+        try:
+            # The 'html' translator matches tag names case-insensitively and supports HTML
+            # pseudo-classes such as :checked and :link, as the BeautifulSoup path did.
+            return CSSSelector(selector, translator='html')
+        except Exception as e:
+            raise ValueError(f"Invalid CSS selector '{selector}': {e}") from e
+    raise ValueError(f"Invalid extraction method: {method}")
+
+def compile_config_selectors(config):
+    """
+    Validates and compiles every selector in a manufacturer configuration.
+
+    Meant to be called once at job start, so a typo in a selector stops the run
+    before any network traffic instead of failing silently on every row.
+
+    Args:
+        config (dict): The manufacturer configuration, as returned by load_config().
+
+    Returns:
+        dict: Compiled selectors keyed by config field name (e.g. 'family_selector').
+        Fields that are empty in the config are left out.
+
+    Raises:
+        ValueError: If one or more selectors are invalid. The message lists all of them.
+    """
+    compiled = {}
+    errors = []
+    for selector_field, type_field in SELECTOR_FIELDS:
+        selector = config.get(selector_field)
+        if not selector:
+            continue
+        try:
+            compiled[selector_field] = compile_selector(config.get(type_field, 'xpath'), selector)
+        except ValueError as e:
+            errors.append(f"{selector_field}: {e}")
+    if errors:
+        raise ValueError("Invalid selector configuration:\n" + "\n".join(errors))
+    return compiled
+
+class ParsedDocument:
+    """
+    An HTML page parsed once with lxml and shared by every extractor.
+
+    Args:
+        html_content (bytes): The HTML content of the webpage.
+        url (str, optional): The URL the page was fetched from.
+    """
+
+    def __init__(self, html_content, url=None):
+        self.url = url
+        self.tree = etree.HTML(html_content) if html_content else None
+
+    def select(self, method, selector):
+        """
+        Evaluates an XPath or CSS selector against the document.
+
+        Args:
+            method (str): 'xpath' or 'css'.
+            selector (str): The selector to evaluate.
+
+        Returns:
+            list: The matching elements (or strings, for XPath attribute/text selectors).
+
+        Raises:
+            ValueError: If the method is not 'xpath' or 'css', or the selector is invalid.
+        """
+        if self.tree is None:
+            return []
+        return compile_selector(method, selector)(self.tree)
+
+class IncrementalDocument(ParsedDocument):
+    """
+    A ParsedDocument that is built chunk by chunk while a page is downloading.
+
+    The tree grows with every feed(), and select() evaluates selectors against
+    the part received so far, so an extractor can stop the download as soon
+    as what it needs has arrived.
+
+    Args:
+        url (str, optional): The URL the page is fetched from.
+    """
+
+    def __init__(self, url=None):
+        self.url = url
+        self.tree = None
+        self.bytes_fed = 0
+        self._parser = etree.HTMLPullParser(events=('start',))
+
+    def feed(self, chunk):
+        self._parser.feed(chunk)
+        self.bytes_fed += len(chunk)
+        for _, element in self._parser.read_events():
+            if self.tree is None:
+                self.tree = element.getroottree().getroot()
+
+    def close(self):
+        """Finishes parsing after the last chunk."""
+        root = self._parser.close()
+        if root is not None:
+            self.tree = root
+
+def as_document(html_content, url=None):
+    """Returns html_content unchanged if it is already a ParsedDocument, otherwise parses it."""
+    if isinstance(html_content, ParsedDocument):
+        return html_content
+    return ParsedDocument(html_content, url)
+
+def _element_text(element):
+    """Returns the stripped text of an element and all of its descendants."""
+    return "".join(text.strip() for text in element.itertext())
+
+def extract_link(html_content, method='xpath', selector=None, base_url=None, url=None, progress_callback=None):
+    """
+    Extracts a link from HTML content using either XPath or CSS selector.
+
+    Args:
+        html_content (bytes or ParsedDocument): The HTML content of the webpage, or the already parsed page.
+        method (str, optional): The extraction method ('xpath' or 'css'). Defaults to 'xpath'.
+        selector (str, optional): The XPath or CSS selector to use. Defaults to None.
+        base_url (str, optional): The base URL to prepend to relative links. Defaults to None.
+        url (str, optional): The URL of the current page (for resolving relative URLs). Defaults to None.
+        progress_callback (callable, optional): Function to call with progress updates.
+
+    Returns:
+        str: The extracted link, or None if not found.
+    """
+    if not selector:
+        return None
+
+    if method not in ('xpath', 'css'):
+        if progress_callback:
+            progress_callback(f"Invalid extraction method: {method}", 100)
+        return None
+
+    try:
+        document = as_document(html_content, url)
+        link_elements = document.select(method, selector)
+        if method == 'xpath':
+            if link_elements:
+                href = link_elements[0].get('href')
+                if href:
+                    return urljoin(base_url if base_url else urlparse(url).scheme + "://" + urlparse(url).netloc, href)
+            elif progress_callback:
+                progress_callback(f"Link not found with XPath: {selector}", 90)
+        else:
+            if link_elements and link_elements[0].get('href') is not None:
+                href = link_elements[0].get('href')
+                return urljoin(base_url if base_url else urlparse(url).scheme + "://" + urlparse(url).netloc, href)
+            elif progress_callback:
+                progress_callback(f"Link not found with CSS selector: {selector}", 90)
+    except (etree.XPathEvalError, Exception) as e:
+        if progress_callback:
+            progress_callback(f"Error during link extraction ({method}): {e}", 100)
+        return None
+    return None
+
+def extract_data(html_content, method='xpath', selector=None):
+    """
+    Extracts text data from HTML content using either XPath or CSS selector.
+
+    Args:
+        html_content (bytes or ParsedDocument): The HTML content, or the already parsed page.
+        method (str, optional): 'xpath' or 'css'. Defaults to 'xpath'.
+        selector (str, optional): The XPath or CSS selector. Defaults to None.
+
+    Returns:
+        list: A list of extracted text strings.
+    """
+    if not selector or method not in ('xpath', 'css'):
+        return []
+    try:
+        elements = as_document(html_content).select(method, selector)
+        if method == 'xpath':
+            return [element.text.strip() for element in elements if element.text is not None]
+        return [_element_text(element) for element in elements]
+    except (etree.XPathEvalError, Exception) as e:
+        print(f"Error during data extraction ({method}): {e}")
+        return []
+
+def extract_image_links(html_content, method='xpath', selector=None, base_url=None, url=None):
+    """
+    Extracts image source URLs using either XPath or CSS selector.
+
+    Args:
+        html_content (bytes or ParsedDocument): The HTML content, or the already parsed page.
+        method (str, optional): 'xpath' or 'css'. Defaults to 'xpath'.
+        selector (str, optional): The XPath or CSS selector. Defaults to None.
+        base_url (str, optional): The base URL for resolving relative paths. Defaults to None.
+        url (str, optional): The URL of the current page. Defaults to None.
+
+    Returns:
+        list: A list of image URLs.
+    """
+    if not selector or method not in ('xpath', 'css'):
+        return []
+    try:
+        img_elements = as_document(html_content, url).select(method, selector)
+        if method == 'xpath':
+            return [urljoin(base_url if base_url else urlparse(url).scheme + "://" + urlparse(url).netloc, img) for img in img_elements if img]
+        return [urljoin(base_url if base_url else urlparse(url).scheme + "://" + urlparse(url).netloc, img.get('src')) for img in img_elements if img.get('src') is not None]
+    except (etree.XPathEvalError, Exception) as e:
+        print(f"Error during image link extraction ({method}): {e}")
+        return []
+
+class _HostState:
+    """Per-host bookkeeping for HostConcurrencyLimiter."""
+
+    def __init__(self, limit, burst, rate):
+        self.limit = limit
+        self.max_limit = limit
+        self.rate = rate
+        self.in_flight = 0
+        self.tokens = burst
+        self.refilled_at = time.monotonic()
+        self.blocked_until = 0.0
+        self.error_rate = 0.0
+        self.successes = 0
+        self.decreased_at = 0.0
+        self.throttled = 0
+
+class HostConcurrencyLimiter:
+    """
+    Caps the number of requests in flight, both overall and per host, and
+    paces each host with a token bucket.
+
+    When adaptive, each host's concurrency limit follows the server's health:
+    it is halved (at most once per second) on a 429/503 or when the recent
+    error rate rises above 20%, and grows back by one after a run of
+    successful requests. A Retry-After header pauses all requests to that host
+    until the given time. Individual hosts can be given their own concurrency
+    and rate limits with configure_host(), e.g. when several manufacturers
+    share one limiter.
+
+    Args:
+        max_total (int, optional): Maximum concurrent requests across all hosts. Defaults to 8.
+        max_per_host (int, optional): Maximum concurrent requests to a single host. Defaults to 4.
+        rate_per_host (float, optional): Sustained requests per second per host. None means unlimited.
+        burst (int, optional): Token bucket size, i.e. requests that may start back to back. Defaults to max_per_host.
+        adaptive (bool, optional): Narrow and widen per-host concurrency from the error rate. Defaults to True.
+    """
+
+    ERROR_RATE_THRESHOLD = 0.2
+
+    def __init__(self, max_total=8, max_per_host=4, rate_per_host=None, burst=None, adaptive=True):
+        self.max_total = max(1, int(max_total))
+        self.max_per_host = max(1, int(max_per_host))
+        self.rate_per_host = rate_per_host or None
+        self.burst = max(1, int(burst or self.max_per_host))
+        self.adaptive = adaptive
+        self._total = threading.BoundedSemaphore(self.max_total)
+        self._hosts = {}
+        self._host_limits = {}
+        self._cond = threading.Condition()
+
+    def configure_host(self, host, max_per_host=None, rate_per_host=None):
+        """
+        Overrides the concurrency and rate limits of one host (a 'netloc' such as 'www.example.com').
+
+        Args:
+            host (str): The host to configure.
+            max_per_host (int, optional): Maximum concurrent requests to this host. Defaults to the limiter's max_per_host.
+            rate_per_host (float, optional): Sustained requests per second to this host. Defaults to the limiter's rate_per_host.
+        """
+        limit = max(1, int(max_per_host or self.max_per_host))
+        rate = rate_per_host or self.rate_per_host
+        with self._cond:
+            self._host_limits[host] = (limit, rate)
+            if host in self._hosts:
+                state = self._hosts[host]
+                state.max_limit = limit
+                state.limit = min(state.limit, limit)
+                state.rate = rate
+            self._cond.notify_all()
+
+    def _host_state(self, host):
+        if host not in self._hosts:
+            limit, rate = self._host_limits.get(host, (self.max_per_host, self.rate_per_host))
+            self._hosts[host] = _HostState(limit, self.burst, rate)
+        return self._hosts[host]
+
+    def _wait_time(self, state, now):
+        """Returns 0 if a request may start now, the seconds to wait, or None to wait for a slot to free up."""
+        if now < state.blocked_until:
+            return state.blocked_until - now
+        if state.in_flight >= state.limit:
+            return None
+        if state.rate:
+            state.tokens = min(self.burst, state.tokens + (now - state.refilled_at) * state.rate)
+            state.refilled_at = now
+            if state.tokens < 1:
+                return (1 - state.tokens) / state.rate
+            state.tokens -= 1
+        return 0
+
+    @contextmanager
+    def slot(self, url):
+        """Blocks until a request to the URL's host may start, and releases the slot afterwards."""
+        with self._cond:
+            state = self._host_state(urlparse(url).netloc)
+            while True:
+                wait_for = self._wait_time(state, time.monotonic())
+                if wait_for == 0:
+                    break
+                self._cond.wait(wait_for)
+            state.in_flight += 1
+        try:
+            with self._total:
+                yield
+        finally:
+            with self._cond:
+                state.in_flight -= 1
+                self._cond.notify_all()
+
+    def record(self, url, status_code=None, error=False, retry_after=None):
+        """
+        Feeds the outcome of a request back into the host's limits.
+
+        Args:
+            url (str): The requested URL.
+            status_code (int, optional): The HTTP status, if a response was received.
+            error (bool, optional): True for connection errors and timeouts.
+            retry_after (float, optional): Seconds from a Retry-After header.
+        """
+        now = time.monotonic()
+        throttled = status_code in (429, 503)
+        failed = error or throttled or (status_code is not None and status_code >= 500)
+        with self._cond:
+            state = self._host_state(urlparse(url).netloc)
+            if retry_after:
+                state.blocked_until = max(state.blocked_until, now + retry_after)
+            state.error_rate = state.error_rate * 0.9 + (0.1 if failed else 0.0)
+            if failed:
+                state.throttled += 1
+                state.successes = 0
+                if (self.adaptive and state.limit > 1 and now - state.decreased_at >= 1.0
+                        and (throttled or state.error_rate > self.ERROR_RATE_THRESHOLD)):
+                    state.limit = max(1, state.limit // 2)
+                    state.decreased_at = now
+            else:
+                state.successes += 1
+                if self.adaptive and state.limit < state.max_limit and state.successes >= state.limit * 10:
+                    state.limit += 1
+                    state.successes = 0
+            self._cond.notify_all()
+
+    def stats(self):
+        """Returns per-host dicts with the current concurrency 'limit', 'failures' and recent 'error_rate'."""
+        with self._cond:
+            return {host: {'limit': state.limit, 'failures': state.throttled, 'error_rate': round(state.error_rate, 3)}
+                    for host, state in self._hosts.items()}
+
+class RetryPolicy:
+    """
+    Decides whether and when get_html_content retries a failed request.
+
+    Connection errors, timeouts and the statuses in RETRYABLE_STATUS_CODES are
+    retried with exponential backoff and full jitter, waiting at least as long
+    as a Retry-After header asks. Other 4xx responses fail immediately. The
+    retry budget caps the total number of retries across a whole run, so a
+    site that is down does not stall the job with endless backoffs.
+
+    Args:
+        max_attempts (int, optional): Attempts per URL, including the first. Defaults to 3.
+        backoff_base (float, optional): Backoff ceiling in seconds for the first retry; doubles on each retry. Defaults to 1.0.
+        backoff_max (float, optional): Largest backoff in seconds. Defaults to 60.
+        retry_budget (int, optional): Total retries allowed per run. None means unlimited.
+    """
+
+    RETRYABLE_STATUS_CODES = (408, 425, 429, 500, 502, 503, 504)
+
+    def __init__(self, max_attempts=3, backoff_base=1.0, backoff_max=60.0, retry_budget=None):
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_budget = retry_budget
+        self.retries = 0
+        self.budget_exhausted = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, config):
+        return cls(max_attempts=config.get('max_retries', 3),
+                   backoff_base=config.get('backoff_base', 1.0),
+                   backoff_max=config.get('backoff_max', 60.0),
+                   retry_budget=config.get('retry_budget'))
+
+    def backoff(self, attempt, retry_after=None):
+        """Returns the seconds to sleep before retry number attempt + 1."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        return max(delay, retry_after or 0)
+
+    def spend(self):
+        """Takes one retry from the budget. Returns False if the budget is used up."""
+        with self._lock:
+            if self.retry_budget is not None and self.retries >= self.retry_budget:
+                self.budget_exhausted += 1
+                return False
+            self.retries += 1
+            return True
+
+    def stats(self):
+        with self._lock:
+            return {'retries': self.retries, 'budget_exhausted': self.budget_exhausted}
+
+def parse_retry_after(value):
+    """Converts a Retry-After header (seconds or an HTTP date) into seconds from now, or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except (TypeError, ValueError):
+        return None
+
+class RunProfiler:
+    """
+    Collects per-stage timings, counters and throughput for one run.
+
+    Stages recorded by the scraper: 'connect' (DNS + TCP/TLS), 'server_wait'
+    (request sent until response headers), 'search_fetch' and 'product_fetch'
+    (whole get_html_content call, including retries), 'retry_sleep', 'parse',
+    'extract_link', 'extract_family', 'extract_images', 'output_write',
+    'progress_event' (subscriber callbacks, e.g. console output) and
+    'gui_update'. Counters include 'bytes', 'retries' and 'cache_hits'.
+
+    A sampled subset of rows can additionally be run under cProfile (or
+    pyinstrument, when installed) to see where time goes inside a stage.
+
+    Args:
+        sample_rate (float, optional): Fraction of rows to profile, 0 to 1. Defaults to 0.
+        backend (str, optional): 'cprofile' or 'pyinstrument'. Defaults to 'cprofile'.
+        throughput_interval (float, optional): Seconds per throughput bucket. Defaults to 10.
+    """
+
+    HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000)
+
+    def __init__(self, sample_rate=0.0, backend='cprofile', throughput_interval=10.0):
+        self.sample_rate = sample_rate or 0.0
+        self.backend = backend
+        self.throughput_interval = throughput_interval
+        self.started_at = time.monotonic()
+        self._samples = {}
+        self._counters = {}
+        self._rows_per_bucket = {}
+        self._lock = threading.Lock()
+        self._cprofile_stats = None
+        self._pyinstrument_session = None
+        self._sampling = threading.Lock()
+        self.sampled_rows = 0
+
+    def record(self, stage, seconds):
+        with self._lock:
+            if stage not in self._samples:
+                self._samples[stage] = array('d')
+            self._samples[stage].append(seconds)
+
+    def count(self, counter, amount=1):
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + amount
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def row_done(self):
+        bucket = int((time.monotonic() - self.started_at) // self.throughput_interval)
+        with self._lock:
+            self._rows_per_bucket[bucket] = self._rows_per_bucket.get(bucket, 0) + 1
+
+    def event_hook(self, on_event):
+        """Wraps a process_manufacturer() subscriber so rows are counted and its own cost is timed."""
+        def hook(event):
+            if event['type'] == 'row':
+                self.row_done()
+            if on_event:
+                with self.stage('progress_event'):
+                    on_event(event)
+        return hook
+
+    def should_sample(self):
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    @contextmanager
+    def sampled(self):
+        """
+        Runs the block under the sampling profiler and merges the result into the run's profile.
+        Only one block is profiled at a time; if another row is already being profiled, the block runs unprofiled.
+        """
+        if not self._sampling.acquire(blocking=False):
+            yield
+            return
+        try:
+            with self._profiled():
+                yield
+        finally:
+            self._sampling.release()
+
+    @contextmanager
+    def _profiled(self):
+        if self.backend == 'pyinstrument':
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                print("pyinstrument is not installed; falling back to cProfile.")
+                self.backend = 'cprofile'
+            else:
+                profiler = Profiler()
+                profiler.start()
+                try:
+                    yield
+                finally:
+                    session = profiler.stop()
+                    with self._lock:
+                        self.sampled_rows += 1
+                        if self._pyinstrument_session is None:
+                            self._pyinstrument_session = session
+                        else:
+                            self._pyinstrument_session = type(session).combine(self._pyinstrument_session, session)
+                return
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            with self._lock:
+                self.sampled_rows += 1
+                if self._cprofile_stats is None:
+                    self._cprofile_stats = pstats.Stats(profiler)
+                else:
+                    self._cprofile_stats.add(profiler)
+
+    @staticmethod
+    def _percentile(sorted_values, fraction):
+        return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+    def report(self):
+        """
+        Returns the run profile as a JSON-serialisable dict: per-stage count, total, mean,
+        p50/p95/p99/max (seconds) and a millisecond histogram, plus counters and throughput over time.
+        """
+        with self._lock:
+            samples = {stage: sorted(values) for stage, values in self._samples.items()}
+            counters = dict(self._counters)
+            buckets = dict(self._rows_per_bucket)
+        stages = {}
+        for stage, values in sorted(samples.items()):
+            histogram = [0] * (len(self.HISTOGRAM_BOUNDS_MS) + 1)
+            for value in values:
+                histogram[bisect.bisect_left(self.HISTOGRAM_BOUNDS_MS, value * 1000)] += 1
+            labels = [f"<={bound}ms" for bound in self.HISTOGRAM_BOUNDS_MS] + [f">{self.HISTOGRAM_BOUNDS_MS[-1]}ms"]
+            stages[stage] = {
+                'count': len(values),
+                'total': sum(values),
+                'mean': sum(values) / len(values),
+                'p50': self._percentile(values, 0.50),
+                'p95': self._percentile(values, 0.95),
+                'p99': self._percentile(values, 0.99),
+                'max': values[-1],
+                'histogram_ms': {label: count for label, count in zip(labels, histogram) if count},
+            }
+        elapsed = time.monotonic() - self.started_at
+        throughput = []
+        for bucket, rows in sorted(buckets.items()):
+            start_second = bucket * self.throughput_interval
+            covered = max(1e-9, min(self.throughput_interval, elapsed - start_second))  # the last bucket may be partial
+            throughput.append({'start_second': start_second, 'rows': rows, 'rows_per_sec': rows / covered})
+        return {'elapsed': elapsed, 'stages': stages, 'counters': counters,
+                'throughput': throughput, 'sampled_rows': self.sampled_rows}
+
+    def export_json(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def export_sampled_profile(self, path):
+        """Writes the sampled-row profile: a .prof file for cProfile (open with pstats/snakeviz) or HTML for pyinstrument."""
+        if self._cprofile_stats is not None:
+            self._cprofile_stats.dump_stats(path)
+            return path
+        if self._pyinstrument_session is not None:
+            from pyinstrument.renderers import HTMLRenderer
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(HTMLRenderer().render(self._pyinstrument_session))
+            return path
+        return None
+
+def _profile_stage(profiler, name):
+    """Returns a context manager timing the named stage, or a no-op one when there is no profiler."""
+    return profiler.stage(name) if profiler else nullcontext()
+
+def format_profile(report):
+    """Returns a text table of the stage timings in a RunProfiler report."""
+    lines = [f"{'stage':<16} {'count':>7} {'total s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"]
+    for stage, timing in sorted(report['stages'].items(), key=lambda item: -item[1]['total']):
+        lines.append(f"{stage:<16} {timing['count']:>7} {timing['total']:>9.2f} {timing['p50'] * 1000:>8.1f} "
+                     f"{timing['p95'] * 1000:>8.1f} {timing['p99'] * 1000:>8.1f}")
+    counters = report['counters']
+    if counters:
+        lines.append(", ".join(f"{name}: {value}" for name, value in sorted(counters.items())))
+    return "\n".join(lines)
+
+class _CountingAdapter(HTTPAdapter):
+    """HTTPAdapter that counts requests sent and TCP/TLS connections opened, and times each connect."""
+
+    def __init__(self, *args, **kwargs):
+        self.requests_sent = 0
+        self.connections_opened = 0
+        self.on_connect = None  # Called with the seconds spent on DNS + TCP/TLS connect
+        self._request_hooks = threading.local()  # on_connect of the request running on this thread, see HttpSession.get()
+        self._counter_lock = threading.Lock()
+        super().__init__(*args, **kwargs)
+
+    def _count_connection(self, conn):
+        connect = conn.connect
+
+        def timed_connect():
+            # Counted per connect rather than per connection object, because a pooled
+            # connection whose socket was closed (e.g. an abandoned stream) reconnects.
+            with self._counter_lock:
+                self.connections_opened += 1
+            start = time.perf_counter()
+            try:
+                connect()
+            finally:
+                on_connect = getattr(self._request_hooks, 'on_connect', None) or self.on_connect
+                if on_connect:
+                    on_connect(time.perf_counter() - start)
+
+        conn.connect = timed_connect
+        return conn
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        adapter = self
+
+        class CountingHTTPConnectionPool(HTTPConnectionPool):
+            def _new_conn(self):
+                return adapter._count_connection(super()._new_conn())
+
+        class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+            def _new_conn(self):
+                return adapter._count_connection(super()._new_conn())
+
+        self.poolmanager.pool_classes_by_scheme = {'http': CountingHTTPConnectionPool,
+                                                   'https': CountingHTTPSConnectionPool}
+
+    def send(self, request, **kwargs):
+        with self._counter_lock:
+            self.requests_sent += 1
+        return super().send(request, **kwargs)
+
+class HttpSession:
+    """
+    Shared keep-alive HTTP transport for all page fetches.
+
+    Wraps a requests.Session whose connection pools are sized per host, so
+    consecutive requests to the same manufacturer reuse open TCP/TLS
+    connections. Responses are gzip/deflate decoded, and brotli decoded when
+    the 'brotli' or 'brotlicffi' package is installed.
+
+    Args:
+        pool_size (int, optional): Maximum number of kept-alive connections per host. Defaults to 10.
+        max_hosts (int, optional): Number of per-host pools to keep. Defaults to 10.
+        headers (dict, optional): Headers sent with every request. Defaults to DEFAULT_HEADERS.
+    """
+
+    def __init__(self, pool_size=10, max_hosts=10, headers=None):
+        self.session = requests.Session()
+        self.session.headers.update(headers or DEFAULT_HEADERS)
+        self.session.verify = False
+        self.adapter = _CountingAdapter(pool_connections=max_hosts, pool_maxsize=max(1, int(pool_size)), pool_block=False)
+        self.session.mount('http://', self.adapter)
+        self.session.mount('https://', self.adapter)
+
+    def get(self, url, timeout=15, on_connect=None, **kwargs):
+        """
+        Sends a GET request.
+
+        Args:
+            on_connect (callable, optional): Called with the seconds spent opening a connection, if this
+                request needs a new one. Lets jobs that share the session each time their own connects.
+        """
+        hooks = self.adapter._request_hooks
+        hooks.on_connect = on_connect
+        try:
+            return self.session.get(url, timeout=timeout, **kwargs)
+        finally:
+            hooks.on_connect = None
+
+    def stats(self):
+        """Returns a dict with the number of requests sent, connections opened and connections reused."""
+        requests_sent = self.adapter.requests_sent
+        connections_opened = self.adapter.connections_opened
+        return {
+            'requests': requests_sent,
+            'connections_opened': connections_opened,
+            'connections_reused': max(0, requests_sent - connections_opened),
+        }
+
+    def close(self):
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+_default_session = None
+_default_session_lock = threading.Lock()
+
+def get_default_session():
+    """Returns the process-wide HttpSession used when no session is passed explicitly."""
+    global _default_session
+    with _default_session_lock:
+        if _default_session is None:
+            _default_session = HttpSession()
+        return _default_session
+
+CACHE_LOW_WATER = 0.9  # fraction of max_bytes kept after an eviction
+CACHE_EVICT_BATCH = 256  # entries read per eviction query
+
+class ResponseCache:
+    """
+    Persistent on-disk cache of fetched pages, stored in a SQLite file.
+
+    Bodies are zlib-compressed and keyed by URL. Entries younger than the TTL
+    are served without touching the network; older entries are revalidated
+    with If-None-Match / If-Modified-Since when the server sent an ETag or
+    Last-Modified header. When the file grows beyond max_bytes, the least
+    recently used entries are evicted until it is back under 90% of
+    max_bytes, so eviction runs once per batch of stores rather than on every
+    store. In offline mode the network is never used: cached pages are served
+    regardless of age and misses return None.
+
+    Args:
+        path (str): Path of the SQLite cache file. Created if missing.
+        ttl (float, optional): Seconds an entry stays fresh. None means entries never go stale. Defaults to 7 days.
+        max_bytes (int, optional): Maximum total size of stored (compressed) bodies. Defaults to 1 GiB.
+        offline (bool, optional): Serve only from the cache, never from the network. Defaults to False.
+    """
+
+    def __init__(self, path, ttl=7 * 24 * 3600, max_bytes=1024 ** 3, offline=False):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self.stored = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")  # with WAL: no fsync per commit, still safe against corruption
+        self._db.execute("""CREATE TABLE IF NOT EXISTS responses (
+                                url TEXT PRIMARY KEY,
+                                body BLOB NOT NULL,
+                                size INTEGER NOT NULL,
+                                etag TEXT,
+                                last_modified TEXT,
+                                stored_at REAL NOT NULL,
+                                accessed_at REAL NOT NULL)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+        self._db.commit()
+        self._total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, url):
+        """
+        Looks up a cached response.
+
+        Returns:
+            dict: 'body', 'etag', 'last_modified' and 'fresh' (True if within the TTL or offline),
+            or None if the URL is not cached.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT body, etag, last_modified, stored_at FROM responses WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE url = ?", (now, url))
+            self._db.commit()
+        body, etag, last_modified, stored_at = row
+        fresh = self.offline or self.ttl is None or now - stored_at < self.ttl
+        if fresh:
+            with self._lock:
+                self.hits += 1
+        return {'body': zlib.decompress(body), 'etag': etag, 'last_modified': last_modified, 'fresh': fresh}
+
+    def put(self, url, body, etag=None, last_modified=None):
+        """Stores a response body, replacing any previous entry for the URL, and evicts old entries if needed."""
+        compressed = zlib.compress(body)
+        now = time.time()
+        with self._lock:
+            previous = self._db.execute("SELECT size FROM responses WHERE url = ?", (url,)).fetchone()
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                             (url, compressed, len(compressed), etag, last_modified, now, now))
+            self._total_bytes += len(compressed) - (previous[0] if previous else 0)
+            self.stored += 1
+            self._evict()
+            self._db.commit()
+
+    def mark_revalidated(self, url):
+        """Restarts the TTL of an entry after the server answered 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            self._db.execute("UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+            self._db.commit()
+            self.revalidated += 1
+            self.hits += 1
+
+    def _evict(self):
+        """Once over max_bytes, drops the least recently used entries until the cache is back under the low-water mark."""
+        if self.max_bytes is None or self._total_bytes <= self.max_bytes:
+            return
+        target = self.max_bytes * CACHE_LOW_WATER
+        while self._total_bytes > target:
+            rows = self._db.execute("SELECT url, size FROM responses ORDER BY accessed_at LIMIT ?", (CACHE_EVICT_BATCH,)).fetchall()
+            if not rows:
+                break
+            evicted = []
+            for url, size in rows:
+                if self._total_bytes <= target:
+                    break
+                evicted.append((url,))
+                self._total_bytes -= size
+            self._db.executemany("DELETE FROM responses WHERE url = ?", evicted)
+
+    def stats(self):
+        """Returns a dict with hit, miss, revalidation and store counts and the cache size in bytes."""
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'revalidated': self.revalidated,
+                    'stored': self.stored, 'bytes': self._total_bytes}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def open_response_cache(config):
+    """
+    Returns a ResponseCache for the config's 'cache_path', or None if no cache is configured.
+
+    Raises:
+        ValueError: If 'offline' is set without a 'cache_path'; there would be nothing to replay from.
+    """
+    if not config.get('cache_path'):
+        if config.get('offline'):
+            raise ValueError("Offline mode needs a response cache file (cache_path).")
+        return None
+    return ResponseCache(config['cache_path'],
+                         ttl=config.get('cache_ttl', 7 * 24 * 3600),
+                         max_bytes=int(config.get('cache_max_mb', 1024) * 1024 * 1024),
+                         offline=config.get('offline', False))
+
+def get_html_content(url, progress_callback=None, limiter=None, session=None, cache=None, retry_policy=None, profiler=None,
+                     validators=None, response_info=None, consume=None):
+    """
+    Fetches HTML content with potential retries.
+
+    Args:
+        url (str): The URL to fetch.
+        progress_callback (callable, optional): Function to call with progress updates.
+        limiter (HostConcurrencyLimiter, optional): Limiter that each attempt must hold a slot from.
+        session (HttpSession, optional): Transport to fetch with. Defaults to the shared get_default_session().
+        cache (ResponseCache, optional): On-disk cache to serve from and store into.
+        retry_policy (RetryPolicy, optional): When and how often to retry. Defaults to RetryPolicy().
+        profiler (RunProfiler, optional): Receives connect, server wait and retry sleep timings, bytes and retry counts.
+        validators (dict, optional): 'etag' and/or 'last_modified' of a copy the caller already has, sent as
+            If-None-Match / If-Modified-Since when the cache has no entry for the URL.
+        response_info (dict, optional): Filled with the page's 'etag' and 'last_modified', and with
+            'not_modified': True when the server confirmed the caller's validators (the return value is then None).
+        consume (callable, optional): Reads a successful (200) response incrementally instead of downloading the
+            whole body: the request is sent with stream=True and consume(response) is returned in place of the
+            body, which is not cached. Pages served from the cache are still returned as bytes.
+
+    Returns:
+        bytes: The response body (or the result of consume), or None if the fetch failed.
+    """
+    conditional_headers = {}
+    cached = None
+    if response_info is None:
+        response_info = {}
+    if cache:
+        cached = cache.get(url)
+        if cached:
+            response_info.update(etag=cached['etag'], last_modified=cached['last_modified'])
+        if cached and cached['fresh']:
+            if profiler:
+                profiler.count('cache_hits')
+            if progress_callback:
+                progress_callback("HTML served from cache.", 40)
+            return cached['body']
+        if cache.offline:
+            if progress_callback:
+                progress_callback(f"Offline mode: {url} is not cached.", 100)
+            return None
+        if cached:
+            if cached['etag']:
+                conditional_headers['If-None-Match'] = cached['etag']
+            if cached['last_modified']:
+                conditional_headers['If-Modified-Since'] = cached['last_modified']
+    if validators and not cached:
+        if validators.get('etag'):
+            conditional_headers['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            conditional_headers['If-Modified-Since'] = validators['last_modified']
+
+    session = session or get_default_session()
+    retry_policy = retry_policy or RetryPolicy()
+    max_retries = retry_policy.max_attempts
+
+    def receive():
+        response = session.get(url, headers=conditional_headers, stream=consume is not None,
+                               on_connect=partial(profiler.record, 'connect') if profiler else None)
+        if consume and response.status_code == 200:
+            return response, consume(response), response.raw.tell()
+        return response, response.content, len(response.content)
+
+    for attempt in range(max_retries):
+        retry_after = None
+        try:
+            if progress_callback:
+                progress_callback(f"Fetching HTML from: {url} (Attempt {attempt + 1}/{max_retries})", 20)
+            if limiter:
+                with limiter.slot(url):
+                    response, content, size = receive()
+            else:
+                response, content, size = receive()
+            if profiler:
+                profiler.record('server_wait', response.elapsed.total_seconds())
+                profiler.count('bytes', size)
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            if limiter:
+                limiter.record(url, response.status_code, retry_after=retry_after)
+            if response.status_code == 304 and cached:
+                cache.mark_revalidated(url)
+                if profiler:
+                    profiler.count('cache_hits')
+                if progress_callback:
+                    progress_callback("Cached HTML is still current.", 40)
+                return cached['body']
+            if response.status_code == 304 and conditional_headers:
+                response_info['not_modified'] = True
+                if progress_callback:
+                    progress_callback("Page has not changed since the previous run.", 40)
+                return None
+            response.raise_for_status()
+            response_info.update(etag=response.headers.get('ETag'), last_modified=response.headers.get('Last-Modified'))
+            if cache and not consume:
+                cache.put(url, content, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            if progress_callback:
+                progress_callback("HTML fetched successfully.", 40)
+            return content
+        except requests.exceptions.HTTPError as e:
+            error_message = f"Error fetching HTML from {url} (Attempt {attempt + 1}/{max_retries}): {e}"
+            if e.response.status_code not in RetryPolicy.RETRYABLE_STATUS_CODES:
+                if progress_callback:
+                    progress_callback(error_message, 100)
+                print(f"{error_message}. Not retrying.")
+                return None
+        except requests.exceptions.RequestException as e:
+            if limiter:
+                limiter.record(url, error=True)
+            error_message = f"Error fetching HTML from {url} (Attempt {attempt + 1}/{max_retries}): {e}"
+        except Exception as e:
+            error_message = f"An error occurred while getting HTML from {url}: {e}"
+            if progress_callback:
+                progress_callback(error_message, 100)
+            print(error_message)
+            return None
+
+        if attempt < max_retries - 1 and retry_policy.spend():
+            delay = retry_policy.backoff(attempt, retry_after)
+            print(f"{error_message}. Retrying in {delay:.1f} seconds...")
+            if profiler:
+                profiler.count('retries')
+            with _profile_stage(profiler, 'retry_sleep'):
+                time.sleep(delay)
+        else:
+            if progress_callback:
+                progress_callback(error_message, 100)
+            print(error_message)
+            return None
+    return None
+
+EXTRACTION_CONFIG_FIELDS = ('product_link_selector', 'product_link_selector_type', 'product_link_base_url',
+                            'family_selector', 'family_selector_type', 'image_selector', 'image_selector_type')
+
+def extract_search_link(html_content, search_url, config, progress_callback=None):
+    """
+    Finds the product link on a search results page, as configured.
+
+    Returns:
+        dict: 'link' (str or None) and 'timings', the seconds spent in the 'parse' and 'extract_link' stages.
+    """
+    start = time.perf_counter()
+    search_document = ParsedDocument(html_content, search_url)
+    parsed = time.perf_counter()
+    link = extract_link(search_document, config.get('product_link_selector_type', 'xpath'), config['product_link_selector'],
+                        config.get('product_link_base_url'), search_url, progress_callback=progress_callback)
+    return {'link': link, 'timings': {'parse': parsed - start, 'extract_link': time.perf_counter() - parsed}}
+
+def extract_product_page(html_content, product_link, config):
+    """
+    Parses a product page once and runs the family and image extractors on it.
+
+    Returns:
+        dict: 'family' (str or None), 'images' (list of URLs) and 'timings', the seconds spent in
+        the 'parse', 'extract_family' and 'extract_images' stages.
+    """
+    timings = {}
+    product_data = {'family': None, 'images': [], 'timings': timings}
+    start = time.perf_counter()
+    product_document = ParsedDocument(html_content, product_link)
+    timings['parse'] = time.perf_counter() - start
+    family_selector = config.get('family_selector')
+    if family_selector:
+        start = time.perf_counter()
+        family_data = extract_data(product_document, config.get('family_selector_type', 'xpath'), family_selector)
+        product_data['family'] = " > ".join(family_data) if family_data else None
+        timings['extract_family'] = time.perf_counter() - start
+
+    image_selector = config.get('image_selector')
+    if image_selector:
+        start = time.perf_counter()
+        product_data['images'] = extract_image_links(product_document, config.get('image_selector_type', 'xpath'), image_selector,
+                                                     urlparse(product_link).scheme + "://" + urlparse(product_link).netloc, product_link)
+        timings['extract_images'] = time.perf_counter() - start
+    return product_data
+
+STREAM_DRAIN_LIMIT = 64 * 1024
+
+def stream_search_link(response, search_url, config, chunk_size=16 * 1024, progress_callback=None):
+    """
+    Finds the product link while a search results page is still downloading.
+
+    The body is read in chunks and fed to an IncrementalDocument. The product link
+    selector is evaluated on the partial tree each time the received size has doubled
+    (starting at chunk_size), which keeps the total selector cost within about twice
+    that of one full-page evaluation. On the first match the download stops: the
+    rest of the body is drained if at most STREAM_DRAIN_LIMIT bytes remain, so the
+    connection can be reused, otherwise the connection is closed.
+
+    Selectors that depend on content after the match (e.g. last(), following::, or
+    conditions on a container that is still open) may pick a different element
+    than a full parse would; keep 'stream_search' off for those.
+
+    Args:
+        response (requests.Response): A successful response fetched with stream=True.
+        search_url (str): The search URL, for resolving relative links.
+        config (dict): The manufacturer configuration.
+        chunk_size (int, optional): Bytes read at a time. Defaults to 16 KiB.
+        progress_callback (callable, optional): Function to call with progress updates.
+
+    Returns:
+        dict: 'link' (str or None) and 'timings', as extract_search_link().
+    """
+    method = config.get('product_link_selector_type', 'xpath')
+    selector = config['product_link_selector']
+    base_url = config.get('product_link_base_url')
+    document = IncrementalDocument(search_url)
+    timings = {'parse': 0.0, 'extract_link': 0.0}
+    link = None
+    complete = False
+    next_check = chunk_size
+    try:
+        for chunk in response.iter_content(chunk_size):
+            start = time.perf_counter()
+            document.feed(chunk)
+            timings['parse'] += time.perf_counter() - start
+            if document.bytes_fed >= next_check and document.tree is not None:
+                start = time.perf_counter()
+                link = extract_link(document, method, selector, base_url, search_url)
+                timings['extract_link'] += time.perf_counter() - start
+                if link:
+                    break
+                next_check = document.bytes_fed * 2
+        else:
+            complete = True
+            start = time.perf_counter()
+            document.close()
+            timings['parse'] += time.perf_counter() - start
+            start = time.perf_counter()
+            link = extract_link(document, method, selector, base_url, search_url, progress_callback=progress_callback)
+            timings['extract_link'] += time.perf_counter() - start
+    finally:
+        if not complete:
+            length = response.headers.get('Content-Length')
+            if length and length.isdigit() and int(length) - response.raw.tell() <= STREAM_DRAIN_LIMIT:
+                for _ in response.iter_content(chunk_size):
+                    pass
+        response.close()
+    return {'link': link, 'timings': timings}
+
+class ExtractionPool:
+    """
+    Runs page parsing and extraction in worker processes, so it scales across
+    cores instead of sharing the GIL with the fetch threads.
+
+    Fetch threads hand over the raw HTML bytes and block until the small
+    extracted result comes back. At most 2 * workers pages are queued for the
+    pool; when it is full, fetch threads wait (backpressure) instead of piling
+    up page bodies in memory.
+
+    Workers are started with the 'spawn' method rather than forked: the pool
+    starts on the first submit, from a fetch thread, while other threads
+    (including other jobs' threads) may hold urllib3, limiter, SQLite or
+    stdout locks that a forked child would inherit in the locked state.
+
+    Args:
+        config (dict): The manufacturer configuration. Only the selector fields are sent to the workers.
+        workers (int, optional): Number of worker processes. Defaults to the number of CPUs.
+    """
+
+    def __init__(self, config, workers=None):
+        self.workers = max(1, int(workers or os.cpu_count() or 1))
+        self.config = {field: config.get(field) for field in EXTRACTION_CONFIG_FIELDS if config.get(field) is not None}
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context('spawn'))
+        self._queue_slots = threading.BoundedSemaphore(self.workers * 2)
+
+    def _run(self, function, *args):
+        with self._queue_slots:
+            return self._executor.submit(function, *args, self.config).result()
+
+    def search_link(self, html_content, search_url):
+        return self._run(extract_search_link, html_content, search_url)
+
+    def product_page(self, html_content, product_link):
+        return self._run(extract_product_page, html_content, product_link)
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def normalize_url(url):
+    """Returns a canonical form of a URL for use as a memo key: lower-case scheme and host, no default port or fragment."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    netloc = parts.netloc.lower()
+    if (scheme == 'http' and netloc.endswith(':80')) or (scheme == 'https' and netloc.endswith(':443')):
+        netloc = netloc.rsplit(':', 1)[0]
+    return urlunsplit((scheme, netloc, parts.path or '/', parts.query, ''))
+
+MEMO_MAX_ENTRIES = 10000  # per table; a few MB of extracted results
+
+class SingleFlightMemo:
+    """
+    Thread-safe, size-bounded memo that computes each key at most once while it is remembered.
+
+    When several workers ask for the same key while it is being computed,
+    they wait for and share the first worker's result instead of starting
+    their own request. Only keys still in flight hold a Future; finished keys
+    keep just their value, and the least recently used values are dropped
+    beyond max_entries so long runs keep flat memory. Failures are not
+    remembered: a None result (a page that could not be fetched) or an
+    exception is shared only with the workers already waiting for it, and a
+    later call computes the key again.
+
+    Args:
+        max_entries (int, optional): Maximum number of finished values kept. None means unbounded.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries
+        self._results = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.evicted = 0
+
+    def get(self, key, compute):
+        """Returns the memoized value for key, calling compute() only if no other call has."""
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                self.hits += 1
+                return self._results[key]
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = self._in_flight[key] = Future()
+                self.misses += 1
+            else:
+                self.shared += 1
+        if not owner:
+            return future.result()
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            del self._in_flight[key]
+            if value is not None:
+                self._results[key] = value
+            if self.max_entries is not None:
+                while len(self._results) > self.max_entries:
+                    self._results.popitem(last=False)
+                    self.evicted += 1
+        future.set_result(value)
+        return value
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'shared': self.shared, 'misses': self.misses, 'evicted': self.evicted}
+
+class RunMemo:
+    """
+    In-run memo of search results (by normalized search URL) and extracted product pages (by normalized product URL).
+
+    Args:
+        max_entries (int, optional): Maximum number of pages remembered per table. None means unbounded.
+    """
+
+    def __init__(self, max_entries=MEMO_MAX_ENTRIES):
+        self.search = SingleFlightMemo(max_entries)
+        self.product = SingleFlightMemo(max_entries)
+
+    @classmethod
+    def from_config(cls, config):
+        """Builds the memo from config['memoize'] and config['memo_max_entries']. Returns None if memoization is off."""
+        if not config.get('memoize', True):
+            return None
+        return cls(config.get('memo_max_entries', MEMO_MAX_ENTRIES))
+
+    def stats(self):
+        return {'search': self.search.stats(), 'product': self.product.stats()}
+
+def _record_timings(page_data, profiler):
+    """Moves the stage 'timings' returned by the extract_* functions into the profiler."""
+    timings = page_data.pop('timings', {})
+    if profiler:
+        for stage, seconds in timings.items():
+            profiler.record(stage, seconds)
+    return page_data
+
+def _utc_now():
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
+
+def fetch_product_page(product_link, config, limiter=None, session=None, cache=None, retry_policy=None, progress_callback=None,
+                       extraction_pool=None, profiler=None, validators=None):
+    """
+    Fetches and extracts one product page.
+
+    Args:
+        product_link (str): The product page URL.
+        config (dict): The manufacturer configuration.
+        validators (dict, optional): 'etag' / 'last_modified' of the previous copy, for a conditional GET.
+        The other arguments are as for scrape_identifier().
+
+    Returns:
+        dict: 'family', 'images', 'etag' and 'last_modified'; {'not_modified': True} if the server
+        confirmed the validators; or None if the page could not be fetched.
+    """
+    response_info = {}
+    with _profile_stage(profiler, 'product_fetch'):
+        html_product_content = get_html_content(product_link, progress_callback=progress_callback, limiter=limiter, session=session,
+                                                cache=cache, retry_policy=retry_policy, profiler=profiler,
+                                                validators=validators, response_info=response_info)
+    if response_info.get('not_modified'):
+        return {'not_modified': True}
+    if not html_product_content:
+        return None
+    if extraction_pool:
+        product_data = _record_timings(extraction_pool.product_page(html_product_content, product_link), profiler)
+    else:
+        product_data = _record_timings(extract_product_page(html_product_content, product_link, config), profiler)
+    product_data['etag'] = response_info.get('etag')
+    product_data['last_modified'] = response_info.get('last_modified')
+    return product_data
+
+def scrape_identifier(identifier, config, limiter=None, session=None, cache=None, retry_policy=None, progress_callback=None,
+                      memo=None, extraction_pool=None, profiler=None):
+    """
+    Runs the search -> product link -> product page steps for a single identifier.
+
+    Args:
+        identifier: The product identifier (e.g. MPN) to search for.
+        config (dict): The manufacturer configuration, as returned by load_config().
+        limiter (HostConcurrencyLimiter, optional): Limiter shared by all concurrent fetches.
+        session (HttpSession, optional): Transport shared by all concurrent fetches.
+        cache (ResponseCache, optional): On-disk response cache.
+        retry_policy (RetryPolicy, optional): Retry policy shared by all concurrent fetches.
+        progress_callback (callable, optional): Function to call with progress updates.
+        memo (RunMemo, optional): In-run memo, so duplicate identifiers and identifiers that resolve
+            to the same product page are fetched and extracted once.
+        extraction_pool (ExtractionPool, optional): Process pool that parses the fetched pages. Without
+            it, pages are parsed on the calling thread.
+        profiler (RunProfiler, optional): Receives fetch, parse and extraction timings.
+
+    Returns:
+        dict: 'link', 'family' and 'images' for the identifier, plus a 'status' of
+        'ok', 'no_search_results', 'no_product_link', 'no_product_page' or 'error'
+        and a human readable 'message'. Successful rows also carry the product page's
+        'etag' and 'last_modified' validators and the 'scraped_at' time (ISO 8601, UTC).
+    """
+    result = {'link': None, 'family': None, 'images': [], 'status': 'error', 'message': '',
+              'etag': None, 'last_modified': None, 'scraped_at': None}
+    try:
+        search_url = config['search_url_format'].format(mpn=identifier) # Assuming 'mpn' is the generic identifier key
+
+        def stream(response):
+            return stream_search_link(response, search_url, config, progress_callback=progress_callback)
+
+        def search():
+            with _profile_stage(profiler, 'search_fetch'):
+                html_search_content = get_html_content(search_url, progress_callback=progress_callback, limiter=limiter, session=session,
+                                                       cache=cache, retry_policy=retry_policy, profiler=profiler,
+                                                       consume=stream if config.get('stream_search') else None)
+            if not html_search_content:
+                return None
+            if isinstance(html_search_content, dict):
+                return _record_timings(html_search_content, profiler)
+            if extraction_pool:
+                return _record_timings(extraction_pool.search_link(html_search_content, search_url), profiler)
+            return _record_timings(extract_search_link(html_search_content, search_url, config, progress_callback=progress_callback), profiler)
+
+        search_result = memo.search.get(normalize_url(search_url), search) if memo else search()
+        if search_result is None:
+            result['status'] = 'no_search_results'
+            result['message'] = f"Processing Identifier: {identifier} - Could not retrieve search results."
+            return result
+
+        product_link = search_result['link']
+        result['link'] = product_link
+        if not pd.notna(product_link):
+            result['status'] = 'no_product_link'
+            result['message'] = f"Processing {identifier}: Product link not found."
+            return result
+
+        def product():
+            return fetch_product_page(product_link, config, limiter=limiter, session=session, cache=cache, retry_policy=retry_policy,
+                                      progress_callback=progress_callback, extraction_pool=extraction_pool, profiler=profiler)
+
+        product_data = memo.product.get(normalize_url(product_link), product) if memo else product()
+        if product_data is None:
+            result['status'] = 'no_product_page'
+            result['message'] = f"Processing {identifier}: Failed to fetch product page."
+            return result
+
+        result['family'] = product_data['family']
+        result['images'] = list(product_data['images'])
+        result['etag'] = product_data['etag']
+        result['last_modified'] = product_data['last_modified']
+        result['scraped_at'] = _utc_now()
+        result['status'] = 'ok'
+        result['message'] = f"Processing {identifier}: Product page fetched and data extracted."
+    except Exception as e:
+        print(f"Error processing Identifier {identifier}: {e}")
+        result['status'] = 'error'
+        result['message'] = f"Error processing Identifier {identifier}: {e}"
+    return result
+
+def content_hash(link, family, images):
+    """Returns a short hash of a row's extracted fields, used to tell whether a product changed between runs."""
+    payload = json.dumps([link or None, family or None, [image for image in images if image]], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+CHANGE_STATES = ('new', 'fresh', 'unchanged', 'changed')
+
+def refresh_identifier(identifier, previous, config, refresh_after=24 * 3600, limiter=None, session=None, cache=None,
+                       retry_policy=None, progress_callback=None, memo=None, extraction_pool=None, profiler=None):
+    """
+    Brings one row of a previous run's output up to date with as few requests as possible.
+
+    Rows scraped less than refresh_after seconds ago are reused as they are. Older rows
+    revalidate their product page with a conditional GET (ETag / Last-Modified from the
+    previous run): a 304 reuses the previous fields, otherwise the page is extracted again
+    and compared with the previous fields by content hash. Only when the product page can no
+    longer be fetched (e.g. it moved) does the row get a full search + product scrape.
+
+    Args:
+        identifier: The product identifier.
+        previous (dict): The row from load_previous_output().
+        config (dict): The manufacturer configuration.
+        refresh_after (float, optional): Seconds a previous result stays fresh. Defaults to one day.
+        The other arguments are as for scrape_identifier().
+
+    Returns:
+        dict: As scrape_identifier(), plus a 'change' of 'fresh', 'unchanged' or 'changed'. A row that
+        fails with an exception gets status 'error' and no 'change'.
+    """
+    previous_hash = previous.get('hash') or content_hash(previous['link'], previous['family'], previous['images'])
+    reused = {'link': previous['link'], 'family': previous['family'], 'images': list(previous['images']), 'status': 'ok',
+              'etag': previous.get('etag'), 'last_modified': previous.get('last_modified'), 'scraped_at': previous.get('scraped_at')}
+    try:
+        scraped_at = datetime.fromisoformat(str(previous['scraped_at'])) if previous.get('scraped_at') else None
+    except ValueError:
+        scraped_at = None
+    if scraped_at and scraped_at.tzinfo is None:
+        scraped_at = scraped_at.replace(tzinfo=timezone.utc)
+    if scraped_at and (datetime.now(timezone.utc) - scraped_at).total_seconds() < refresh_after:
+        return dict(reused, change='fresh', message=f"Processing {identifier}: Previous result is still fresh.")
+
+    validators = {'etag': previous.get('etag'), 'last_modified': previous.get('last_modified')}
+
+    def revalidate():
+        return fetch_product_page(previous['link'], config, limiter=limiter, session=session, cache=cache, retry_policy=retry_policy,
+                                  progress_callback=progress_callback, extraction_pool=extraction_pool, profiler=profiler,
+                                  validators=validators)
+
+    try:
+        # Keyed apart from scrape_identifier()'s plain product URLs, since the result may be a bare 'not_modified'
+        revalidate_key = ('revalidate', normalize_url(previous['link']), validators['etag'], validators['last_modified'])
+        product_data = memo.product.get(revalidate_key, revalidate) if memo else revalidate()
+        if product_data and product_data.get('not_modified'):
+            return dict(reused, scraped_at=_utc_now(), change='unchanged',
+                        message=f"Processing {identifier}: Product page not modified.")
+        if product_data is None:
+            result = scrape_identifier(identifier, config, limiter=limiter, session=session, cache=cache, retry_policy=retry_policy,
+                                       progress_callback=progress_callback, memo=memo, extraction_pool=extraction_pool, profiler=profiler)
+        else:
+            result = {'link': previous['link'], 'family': product_data['family'], 'images': list(product_data['images']),
+                      'status': 'ok', 'etag': product_data['etag'], 'last_modified': product_data['last_modified'],
+                      'scraped_at': _utc_now(), 'message': f"Processing {identifier}: Product page revalidated."}
+    except Exception as e:
+        print(f"Error processing Identifier {identifier}: {e}")
+        return {'link': None, 'family': None, 'images': [], 'status': 'error', 'message': f"Error processing Identifier {identifier}: {e}",
+                'etag': None, 'last_modified': None, 'scraped_at': None}
+    unchanged = content_hash(result['link'], result['family'], result['images']) == previous_hash
+    result['change'] = 'unchanged' if unchanged else 'changed'
+    return result
+
+def load_previous_output(path, config):
+    """
+    Reads the output of a previous run for an incremental re-scrape.
+
+    Uses the identifier column, the "{prefix} Link", "Family" and "Image Link N"
+    columns and, when present, the change tracking columns (see TRACKING_COLUMNS).
+    Rows without a product link are left out, so they are scraped from scratch.
+
+    Args:
+        path (str): The previous output (.xlsx, .csv, .jsonl or .parquet).
+        config (dict): The manufacturer configuration.
+
+    Returns:
+        dict: Identifier (as a string) -> dict with 'link', 'family', 'images', 'scraped_at',
+        'etag', 'last_modified' and 'hash'.
+
+    Raises:
+        ValueError: If the identifier or link column is missing.
+    """
+    df = read_input(path)
+    mpn_column = config.get('mpn_column')
+    link_column = f"{config.get('output_prefix', 'Product')} Link"
+    for column in (mpn_column, link_column):
+        if column not in df.columns:
+            raise ValueError(f"Column '{column}' not found in the previous output '{path}'.")
+    image_columns = sorted((column for column in df.columns if re.fullmatch(r"Image Link \d+", str(column))),
+                           key=lambda column: int(column.rsplit(' ', 1)[1]))
+
+    def value(record, column):
+        return record[column] if column in record and pd.notna(record[column]) else None
+
+    previous = {}
+    for record in df.to_dict('records'):
+        link = value(record, link_column)
+        if value(record, mpn_column) is None or not link:
+            continue
+        previous[str(record[mpn_column])] = {
+            'link': link,
+            'family': value(record, 'Family'),
+            'images': [image for image in (value(record, column) for column in image_columns) if image],
+            'scraped_at': value(record, TRACKING_COLUMNS['scraped_at']),
+            'etag': value(record, TRACKING_COLUMNS['etag']),
+            'last_modified': value(record, TRACKING_COLUMNS['last_modified']),
+            'hash': value(record, TRACKING_COLUMNS['hash']),
+        }
+    return previous
+
+def iter_scrape_results(identifiers, config, max_workers=8, max_per_host=4, request_delay=0, session=None, cache=None,
+                        skip_indices=None, limiter=None, retry_policy=None, memo=None, extraction_pool=None, profiler=None,
+                        previous=None):
+    """
+    Scrapes identifiers concurrently on a bounded worker pool.
+
+    Each worker runs the full search -> product pipeline for one identifier, so
+    search and product fetches of different identifiers overlap. At most
+    2 * max_workers identifiers are queued at any time, which keeps memory flat
+    on very large sheets.
+
+    Args:
+        identifiers (iterable): The identifiers to scrape, in row order.
+        config (dict): The manufacturer configuration.
+        max_workers (int, optional): Global cap on concurrent requests (and worker threads). Defaults to 8. With
+            a shared limiter, the number of worker threads of this iteration, capped at limiter.max_total.
+        max_per_host (int, optional): Cap on concurrent requests to a single host. Defaults to 4.
+        request_delay (float, optional): Fixed pause in seconds after each identifier, per worker. Defaults to 0;
+            prefer config['rate_per_host'], which paces requests without idling workers.
+        session (HttpSession, optional): Transport to fetch with. Defaults to a new session whose
+            per-host pool matches max_per_host, closed when the iteration finishes.
+        cache (ResponseCache, optional): On-disk response cache shared by all workers.
+        skip_indices (set, optional): Positions of identifiers that should not be scraped (e.g. already
+            completed in a previous run).
+        limiter (HostConcurrencyLimiter, optional): Limiter to share with other jobs. Defaults to a new
+            limiter built from max_workers, max_per_host and config['rate_per_host'].
+        retry_policy (RetryPolicy, optional): Retry policy to share with other jobs. Defaults to
+            RetryPolicy.from_config(config).
+        memo (RunMemo, optional): In-run memo of search and product pages. Defaults to a new memo bounded by
+            config['memo_max_entries'], unless config['memoize'] is False.
+        extraction_pool (ExtractionPool, optional): Process pool for parsing. Defaults to a new pool with
+            config['parse_workers'] processes when that is set, otherwise pages are parsed on the fetch threads.
+        profiler (RunProfiler, optional): Receives stage timings; a sampled subset of rows is also run under
+            its sampling profiler.
+        previous (dict, optional): Results of a previous run, from load_previous_output(). Identifiers found
+            there are brought up to date with refresh_identifier() (honouring config['refresh_after']) instead
+            of being scraped from scratch, and every result gets a 'change' (see CHANGE_STATES).
+
+    Yields:
+        tuple: (index, identifier, result) in completion order, where index is the
+        position of the identifier in the input and result is from scrape_identifier().
+
+    Raises:
+        ValueError: If a selector in the config is invalid (raised before any request is made).
+    """
+    compile_config_selectors(config)
+    limiter = limiter or HostConcurrencyLimiter(max_workers, max_per_host, rate_per_host=config.get('rate_per_host'))
+    retry_policy = retry_policy or RetryPolicy.from_config(config)
+    if memo is None:
+        memo = RunMemo.from_config(config)
+    owns_session = session is None
+    if owns_session:
+        session = HttpSession(pool_size=limiter.max_per_host)
+    owns_pool = extraction_pool is None and bool(config.get('parse_workers'))
+    if owns_pool:
+        extraction_pool = ExtractionPool(config, config['parse_workers'])
+
+    def work(identifier):
+        with profiler.sampled() if profiler and profiler.should_sample() else nullcontext():
+            previous_result = previous.get(str(identifier)) if previous is not None else None
+            if previous_result:
+                result = refresh_identifier(identifier, previous_result, config, refresh_after=config.get('refresh_after', 24 * 3600),
+                                            limiter=limiter, session=session, cache=cache, retry_policy=retry_policy, memo=memo,
+                                            extraction_pool=extraction_pool, profiler=profiler)
+            else:
+                result = scrape_identifier(identifier, config, limiter=limiter, session=session, cache=cache, retry_policy=retry_policy,
+                                           memo=memo, extraction_pool=extraction_pool, profiler=profiler)
+                if previous is not None or config.get('track_changes'):
+                    result['change'] = 'new'
+        if request_delay:
+            time.sleep(request_delay)
+        return result
+
+    max_workers = max(1, min(int(max_workers or limiter.max_total), limiter.max_total))
+    pending = {}
+    rows = iter(enumerate(identifiers))
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            exhausted = False
+            while True:
+                while not exhausted and len(pending) < max_workers * 2:
+                    try:
+                        index, identifier = next(rows)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    if skip_indices and index in skip_indices:
+                        continue
+                    pending[executor.submit(work, identifier)] = (index, identifier)
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index, identifier = pending.pop(future)
+                    yield index, identifier, future.result()
+    finally:
+        if owns_session:
+            session.close()
+        if owns_pool:
+            extraction_pool.close()
+
+RETRYABLE_STATUSES = ('error', 'no_search_results', 'no_product_page')
+
+class RunJournal:
     """
-    Extracts a link from HTML content using either XPath or CSS selector.
+    Append-only JSONL checkpoint of per-row results, so an interrupted run can be resumed.
+
+    Each line records the row index, identifier and scrape_identifier() result.
+    Results are buffered and written in batches, then flushed to disk.
 
     Args:
-        html_content (bytes): The HTML content of the webpage.
-        method (str, optional): The extraction method ('xpath' or 'css'). Defaults to 'xpath'.
-        selector (str, optional): The XPath or CSS selector to use. Defaults to None.
-        base_url (str, optional): The base URL to prepend to relative links. Defaults to None.
-        url (str, optional): The URL of the current page (for resolving relative URLs). Defaults to None.
-        progress_callback (callable, optional): Function to call with progress updates.
+        path (str): Path of the journal file.
+        batch_size (int, optional): Number of results buffered before they are written. Defaults to 100.
+    """
+
+    def __init__(self, path, batch_size=100):
+        self.path = path
+        self.batch_size = max(1, int(batch_size))
+        self._buffer = []
+        self._file = None
+
+    def load(self, identifiers):
+        """
+        Reads the results of a previous run.
+
+        Args:
+            identifiers (list): The identifiers of the current sheet, in row order. Records whose
+                identifier no longer matches the row are ignored.
+
+        Returns:
+            dict: Row index -> result for rows that finished and do not need a retry. Rows whose
+            latest status is in RETRYABLE_STATUSES are left out, so they are scraped again.
+        """
+        completed = {}
+        if not os.path.exists(self.path):
+            return completed
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # A partially written last line from a crash
+                index = record.get('index')
+                if not isinstance(index, int) or not 0 <= index < len(identifiers):
+                    continue
+                if record.get('identifier') != str(identifiers[index]):
+                    continue
+                if record['result'].get('status') in RETRYABLE_STATUSES:
+                    completed.pop(index, None)
+                else:
+                    completed[index] = record['result']
+        return completed
+
+    def open(self, resume=False):
+        """Opens the journal for writing, truncating it unless resuming."""
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+
+    def record(self, index, identifier, result):
+        self._buffer.append(json.dumps({'index': index, 'identifier': str(identifier), 'result': result}))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer or self._file is None:
+            return
+        self._file.write("\n".join(self._buffer) + "\n")
+        self._buffer = []
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+def iter_input_chunks(path, chunksize=1000):
+    """
+    Reads an identifier sheet in chunks instead of loading it whole.
+
+    Supports .xlsx/.xlsm (openpyxl read-only mode, first row is the header),
+    .csv (read as text, so identifiers keep leading zeros) and .parquet
+    (requires pyarrow).
+
+    Args:
+        path (str): The input file.
+        chunksize (int, optional): Rows per chunk. Defaults to 1000.
+
+    Yields:
+        pd.DataFrame: Consecutive chunks of rows.
+
+    Raises:
+        ValueError: If the file extension is not supported.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        yield from pd.read_csv(path, chunksize=chunksize, dtype=str)
+    elif extension == '.parquet':
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    elif extension in ('.xlsx', '.xlsm'):
+        from openpyxl import load_workbook
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            rows = workbook.active.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            buffer = []
+            for row in rows:
+                buffer.append(row)
+                if len(buffer) >= chunksize:
+                    yield pd.DataFrame(buffer, columns=header)
+                    buffer = []
+            if buffer:
+                yield pd.DataFrame(buffer, columns=header)
+        finally:
+            workbook.close()
+    else:
+        raise ValueError(f"Unsupported input format '{extension}'. Use .xlsx, .csv or .parquet.")
+
+class StreamingWriter:
+    """
+    Appends result rows to a .csv, .jsonl or .parquet file chunk by chunk.
+
+    Parquet output requires pyarrow and stores every column as text, since
+    the type of a column can differ between chunks.
+
+    Args:
+        path (str): The output file. The format is chosen from its extension.
+
+    Raises:
+        ValueError: If the file extension is not supported.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.format = os.path.splitext(path)[1].lower().lstrip('.')
+        if self.format not in ('csv', 'jsonl', 'parquet'):
+            raise ValueError(f"Unsupported output format '.{self.format}'. Use .csv, .jsonl or .parquet.")
+        self.rows_written = 0
+        self._file = None
+        self._parquet_writer = None
+
+    def write(self, frame):
+        if frame.empty:
+            return
+        if self.format == 'csv':
+            if self._file is None:
+                self._file = open(self.path, 'w', encoding='utf-8', newline='')
+            frame.to_csv(self._file, header=self.rows_written == 0, index=False)
+        elif self.format == 'jsonl':
+            if self._file is None:
+                self._file = open(self.path, 'w', encoding='utf-8')
+            text = frame.to_json(orient='records', lines=True, force_ascii=False)
+            self._file.write(text if text.endswith("\n") else text + "\n")
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            frame = pd.DataFrame({str(column): [None if pd.isna(value) else str(value) for value in frame[column]]
+                                  for column in frame.columns})
+            schema = pa.schema([(column, pa.string()) for column in frame.columns])
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, schema)
+            self._parquet_writer.write_table(pa.Table.from_pandas(frame, schema=schema, preserve_index=False))
+        if self._file is not None:
+            self._file.flush()  # rows written so far survive a crash
+        self.rows_written += len(frame)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+STREAMING_MAX_IMAGES = 10  # "Image Link N" columns in streaming mode unless config['max_images'] is set
+
+TRACKING_COLUMNS = {'scraped_at': 'Scraped At', 'etag': 'Page ETag', 'last_modified': 'Page Last Modified',
+                    'hash': 'Content Hash', 'change': 'Change'}
+
+def _tracking_values(result):
+    """Returns the change tracking column values of a result, keyed like TRACKING_COLUMNS."""
+    values = {key: result.get(key) for key in TRACKING_COLUMNS}
+    values['hash'] = content_hash(result['link'], result['family'], result['images']) if result.get('status') == 'ok' else None
+    return values
+
+def _result_columns(record, result, output_prefix, max_images, track_changes=False):
+    record[f'{output_prefix} Link'] = result['link']
+    record['Family'] = result['family']
+    for i in range(max_images):
+        record[f"Image Link {i+1}"] = result['images'][i] if len(result['images']) > i else None
+    if track_changes:
+        for key, value in _tracking_values(result).items():
+            record[TRACKING_COLUMNS[key]] = value
+    return record
+
+def stream_manufacturer(input_path, output_path, config, chunksize=1000, on_event=None, session=None, cache=None,
+                        limiter=None, retry_policy=None, memo=None, extraction_pool=None, profiler=None, previous=None):
+    """
+    Scrapes a sheet of any size with flat memory use, writing results while the run is in progress.
+
+    Identifiers are read chunk by chunk (see iter_input_chunks()) and results are
+    written in input order to a .csv, .jsonl or .parquet file (see StreamingWriter).
+
+    The number of "Image Link N" columns is fixed up front by config['max_images']
+    (default STREAMING_MAX_IMAGES), so every batch of chunksize rows goes straight to
+    the output file; extra images are dropped. Checkpoint/resume does not apply: the
+    output itself holds every row written before a crash.
+
+    Args:
+        input_path (str): The identifier sheet.
+        output_path (str): The output file.
+        config (dict): The manufacturer configuration.
+        chunksize (int, optional): Rows read and written at a time. Defaults to 1000.
+        on_event (callable, optional): Progress subscriber, see process_manufacturer(). The 'total'
+            of row events is None because the row count is not known up front.
+        session (HttpSession, optional): Transport to fetch with.
+        cache (ResponseCache, optional): On-disk response cache.
+        limiter (HostConcurrencyLimiter, optional): Concurrency and rate limiter.
+        retry_policy (RetryPolicy, optional): Retry policy.
+        memo (RunMemo, optional): In-run memo of search and product pages.
+        extraction_pool (ExtractionPool, optional): Process pool for parsing.
+        profiler (RunProfiler, optional): Receives stage timings, including 'output_write'.
+        previous (dict, optional): Results of a previous run for an incremental re-scrape, see iter_scrape_results().
 
     Returns:
-        str: The extracted link, or None if not found.
+        dict: 'rows' written, 'ok' rows, 'max_images', 'output' path and, when changes are
+        tracked, counts of each row 'changes' state.
+
+    Raises:
+        ValueError: If a selector is invalid, a format is unsupported or the identifier column is missing.
     """
-    if not selector:
-        return None
+    compile_config_selectors(config)
+    mpn_column = config.get('mpn_column')
+    output_prefix = config.get('output_prefix', 'Product')
+    max_images = config.get('max_images') or STREAMING_MAX_IMAGES
+    track_changes = bool(config.get('track_changes')) or previous is not None
+    changes = dict.fromkeys(CHANGE_STATES, 0)
+
+    pending_rows = {}
+
+    def identifiers():
+        index = 0
+        for chunk in iter_input_chunks(input_path, chunksize):
+            if mpn_column not in chunk.columns:
+                raise ValueError(f"MPN Column '{mpn_column}' not found in '{input_path}'.")
+            for record in chunk.to_dict('records'):
+                pending_rows[index] = record
+                index += 1
+                yield record[mpn_column]
+
+    writer = StreamingWriter(output_path)
+
+    def write(frame):
+        with _profile_stage(profiler, 'output_write'):
+            writer.write(frame)
+
+    ok_rows = 0
+    completed = {}
+    next_index = 0
+    batch = []
+
+    def emit(record, result):
+        batch.append(_result_columns(record, result, output_prefix, max_images, track_changes))
+        if len(batch) >= chunksize:
+            write(pd.DataFrame(batch))
+            batch.clear()
 
     try:
-        if method == 'xpath':
-            tree = etree.HTML(html_content)
-            link_elements = tree.xpath(selector)
-            if link_elements:
-                href = link_elements[0].get('href')
-                if href:
-                    return urljoin(base_url if base_url else urlparse(url).scheme + "://" + urlparse(url).netloc, href)
-            elif progress_callback:
-                progress_callback(f"Link not found with XPath: {selector}", 90)
-        elif method == 'css':
-            soup = BeautifulSoup(html_content, 'html.parser')
-            link_element = soup.select_one(selector)
-            if link_element and link_element.has_attr('href'):
-                href = link_element['href']
-                return urljoin(base_url if base_url else urlparse(url).scheme + "://" + urlparse(url).netloc, href)
-            elif progress_callback:
-                progress_callback(f"Link not found with CSS selector: {selector}", 90)
-        else:
-            if progress_callback:
-                progress_callback(f"Invalid extraction method: {method}", 100)
-            return None
-    except (etree.XPathEvalError, Exception) as e:
-        if progress_callback:
-            progress_callback(f"Error during link extraction ({method}): {e}", 100)
-        return None
-    return None
+        results = iter_scrape_results(identifiers(), config,
+                                      max_workers=config.get('max_workers', 8),
+                                      max_per_host=config.get('max_per_host', 4),
+                                      request_delay=config.get('request_delay', 0),
+                                      session=session, cache=cache,
+                                      limiter=limiter, retry_policy=retry_policy, memo=memo,
+                                      extraction_pool=extraction_pool, profiler=profiler, previous=previous)
+        for done_count, (index, identifier, result) in enumerate(results, start=1):
+            if result['status'] == 'ok':
+                ok_rows += 1
+            if result.get('change'):
+                changes[result['change']] += 1
+            completed[index] = result
+            while next_index in completed:
+                emit(pending_rows.pop(next_index), completed.pop(next_index))
+                next_index += 1
+            _emit(on_event, 'row', index=index, identifier=identifier, status=result['status'],
+                  message=result['message'], completed=done_count, total=None)
 
-def extract_data(html_content, method='xpath', selector=None):
+        write(pd.DataFrame(batch))
+    finally:
+        writer.close()
+
+    summary = {'rows': writer.rows_written, 'ok': ok_rows, 'max_images': max_images, 'output': output_path}
+    if track_changes:
+        summary['changes'] = changes
+    return summary
+
+REQUIRED_CONFIG_FIELDS = ('mpn_column', 'search_url_format', 'product_link_selector')
+
+def validate_config(config):
     """
-    Extracts text data from HTML content using either XPath or CSS selector.
+    Checks that a manufacturer configuration can be run.
+
+    Raises:
+        ValueError: If a required field is missing, a selector is invalid or options conflict.
+    """
+    missing = [field for field in REQUIRED_CONFIG_FIELDS if not config.get(field)]
+    if missing:
+        raise ValueError(f"Configuration is missing required fields ({', '.join(missing)}).")
+    if config.get('offline') and not config.get('cache_path'):
+        raise ValueError("Offline mode needs a response cache file (cache_path).")
+    if config.get('streaming') and (config.get('journal_path') or config.get('resume')):
+        raise ValueError("Checkpoint journal and resume are not available in streaming mode; "
+                         "the streamed output file already holds every finished row.")
+    compile_config_selectors(config)
+
+def _emit(on_event, event_type, **data):
+    if on_event:
+        data['type'] = event_type
+        on_event(data)
+
+def read_input(path):
+    """Reads a whole identifier sheet (.xlsx/.xls, .csv, .jsonl or .parquet) into a DataFrame."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        return pd.read_csv(path, dtype=str)
+    if extension == '.jsonl':
+        return pd.read_json(path, lines=True, dtype=False)
+    if extension == '.parquet':
+        return pd.read_parquet(path)
+    return pd.read_excel(path)
+
+def write_output(df, path):
+    """Writes the result DataFrame to .xlsx, .csv, .jsonl or .parquet, chosen by extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension == '.csv':
+        df.to_csv(path, index=False)
+    elif extension == '.jsonl':
+        df.to_json(path, orient='records', lines=True, force_ascii=False)
+    elif extension == '.parquet':
+        df.to_parquet(path, index=False)
+    else:
+        df.to_excel(path, index=False)
+
+def scrape_dataframe(df, config, on_event=None, session=None, cache=None, limiter=None, retry_policy=None, memo=None,
+                     extraction_pool=None, profiler=None, previous=None):
+    """
+    Scrapes every identifier of an in-memory sheet and adds the result columns to it.
+
+    Honours config['journal_path'] / config['resume'] (see RunJournal).
 
     Args:
-        html_content (bytes): The HTML content.
-        method (str, optional): 'xpath' or 'css'. Defaults to 'xpath'.
-        selector (str, optional): The XPath or CSS selector. Defaults to None.
+        df (pd.DataFrame): The identifier sheet. Modified in place.
+        config (dict): The manufacturer configuration.
+        on_event (callable, optional): Progress subscriber, see process_manufacturer().
+        session (HttpSession, optional): Transport to fetch with.
+        cache (ResponseCache, optional): On-disk response cache.
+        limiter (HostConcurrencyLimiter, optional): Concurrency and rate limiter.
+        retry_policy (RetryPolicy, optional): Retry policy.
+        memo (RunMemo, optional): In-run memo of search and product pages.
+        extraction_pool (ExtractionPool, optional): Process pool for parsing.
+        profiler (RunProfiler, optional): Receives stage timings.
+        previous (dict, optional): Results of a previous run for an incremental re-scrape, see iter_scrape_results().
 
     Returns:
-        list: A list of extracted text strings.
+        dict: Counts of 'rows', 'ok' rows, rows 'resumed' from the journal and, when changes
+        are tracked, of each row 'changes' state.
+
+    Raises:
+        ValueError: If the identifier column is missing.
     """
-    if not selector:
-        return []
+    mpn_column = config.get('mpn_column')
+    output_prefix = config.get('output_prefix', 'Product')
+    if mpn_column not in df.columns:
+        raise ValueError(f"MPN Column '{mpn_column}' not found in the input file.")
+
+    total_items = len(df[mpn_column])
+    extracted_data = {
+        f'{output_prefix} Link': [None] * total_items,
+        'Family': [None] * total_items,
+        'Image Links': [[]] * total_items
+    }
+    statuses = [None] * total_items
+    track_changes = bool(config.get('track_changes')) or previous is not None
+    tracking = [{}] * total_items
+
+    journal = None
+    previous_results = {}
     try:
-        if method == 'xpath':
-            tree = etree.HTML(html_content)
-            elements = tree.xpath(selector)
-            return [element.text.strip() for element in elements if element.text is not None]
-        elif method == 'css':
-            soup = BeautifulSoup(html_content, 'html.parser')
-            elements = soup.select(selector)
-            return [element.get_text(strip=True) for element in elements]
-        else:
-            return []
-    except (etree.XPathEvalError, Exception) as e:
-        print(f"Error during data extraction ({method}): {e}")
-        return []
+        if config.get('journal_path'):
+            journal = RunJournal(config['journal_path'], batch_size=config.get('journal_batch_size', 100))
+            if config.get('resume'):
+                previous_results = journal.load(list(df[mpn_column]))
+            journal.open(resume=config.get('resume', False))
+        for index, result in previous_results.items():
+            extracted_data[f'{output_prefix} Link'][index] = result['link']
+            extracted_data['Family'][index] = result['family']
+            extracted_data['Image Links'][index] = result['images']
+            statuses[index] = result['status']
+            tracking[index] = _tracking_values(result)
 
-def extract_image_links(html_content, method='xpath', selector=None, base_url=None, url=None):
+        _emit(on_event, 'start', total=total_items, resumed=len(previous_results))
+        results = iter_scrape_results(df[mpn_column], config,
+                                      max_workers=config.get('max_workers', 8),
+                                      max_per_host=config.get('max_per_host', 4),
+                                      request_delay=config.get('request_delay', 0),
+                                      session=session, cache=cache,
+                                      skip_indices=set(previous_results),
+                                      limiter=limiter, retry_policy=retry_policy, memo=memo,
+                                      extraction_pool=extraction_pool, profiler=profiler, previous=previous)
+        for completed, (index, identifier, result) in enumerate(results, start=len(previous_results) + 1):
+            extracted_data[f'{output_prefix} Link'][index] = result['link']
+            extracted_data['Family'][index] = result['family']
+            extracted_data['Image Links'][index] = result['images']
+            statuses[index] = result['status']
+            tracking[index] = _tracking_values(result)
+            if journal:
+                journal.record(index, identifier, result)
+            _emit(on_event, 'row', index=index, identifier=identifier, status=result['status'],
+                  message=result['message'], completed=completed, total=total_items)
+    finally:
+        if journal:
+            journal.close()
+
+    for col, data in extracted_data.items():
+        df[col] = data
+
+    max_images = max(len(links) for links in extracted_data['Image Links']) if extracted_data['Image Links'] else 0
+    for i in range(max_images):
+        df[f"Image Link {i+1}"] = [links[i] if len(links) > i else None for links in extracted_data['Image Links']]
+
+    summary = {'rows': total_items, 'ok': statuses.count('ok'), 'resumed': len(previous_results)}
+    if track_changes:
+        for key, column in TRACKING_COLUMNS.items():
+            df[column] = [values.get(key) for values in tracking]
+        change_column = [values.get('change') for values in tracking]
+        summary['changes'] = {state: change_column.count(state) for state in CHANGE_STATES}
+    return summary
+
+ENGINE_CONFIG_FIELDS = ('max_workers', 'max_per_host', 'rate_per_host', 'max_hosts', 'pool_size', 'max_retries', 'backoff_base',
+                        'backoff_max', 'retry_budget', 'cache_path', 'cache_ttl', 'cache_max_mb', 'offline')
+
+class FetchEngine:
     """
-    Extracts image source URLs using either XPath or CSS selector.
+    The fetch machinery of a run: keep-alive HTTP session, host concurrency and
+    rate limiter, retry policy and optional response cache.
+
+    One engine can serve several jobs at once (see run_jobs()), so all of them
+    draw from the same global concurrency cap and connection pools, and each
+    host's limits hold no matter how many jobs send requests to it.
 
     Args:
-        html_content (bytes): The HTML content.
-        method (str, optional): 'xpath' or 'css'. Defaults to 'xpath'.
-        selector (str, optional): The XPath or CSS selector. Defaults to None.
-        base_url (str, optional): The base URL for resolving relative paths. Defaults to None.
-        url (str, optional): The URL of the current page. Defaults to None.
+        config (dict): Settings; only the keys in ENGINE_CONFIG_FIELDS are used. 'pool_size' (kept-alive
+            connections per host) defaults to 'max_per_host' and must cover any higher per-host limit
+            given to configure_job() later, or the extra connections are not kept alive.
+    """
+
+    def __init__(self, config):
+        self.session = HttpSession(pool_size=config.get('pool_size') or config.get('max_per_host', 4),
+                                   max_hosts=config.get('max_hosts', 10))
+        self.limiter = HostConcurrencyLimiter(config.get('max_workers', 8), config.get('max_per_host', 4),
+                                              rate_per_host=config.get('rate_per_host'))
+        self.retry_policy = RetryPolicy.from_config(config)
+        try:
+            self.cache = open_response_cache(config)
+        except Exception:
+            self.session.close()
+            raise
+
+    def configure_job(self, config):
+        """Applies a job's own 'max_per_host' / 'rate_per_host' to the hosts of its search and product pages."""
+        if not (config.get('max_per_host') or config.get('rate_per_host')):
+            return
+        hosts = {urlparse(config['search_url_format']).netloc, urlparse(config.get('product_link_base_url') or '').netloc}
+        for host in hosts - {''}:
+            self.limiter.configure_host(host, max_per_host=config.get('max_per_host'), rate_per_host=config.get('rate_per_host'))
+
+    def stats(self):
+        """Returns the 'http', 'cache', 'retries' and per-host 'hosts' counters, as in the process_manufacturer() summary."""
+        return {'http': self.session.stats(), 'cache': self.cache.stats() if self.cache else None,
+                'retries': self.retry_policy.stats(), 'hosts': self.limiter.stats()}
+
+    def close(self):
+        self.session.close()
+        if self.cache:
+            self.cache.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def process_manufacturer(input_path, config, output_path=None, on_event=None, profiler=None, engine=None):
+    """
+    Runs a complete scrape job without any GUI. This is the library entry point
+    used by the command line, the Tk GUI and other Python code.
+
+    With config['streaming'] the sheet is processed by stream_manufacturer() and
+    output_path is required. Otherwise the whole sheet is loaded, scraped with
+    scrape_dataframe() and, if output_path is given, written with write_output().
+
+    Progress is reported by calling on_event with a dict whose 'type' is one of:
+        'start':  'total' rows (None when streaming) and rows 'resumed' from a journal.
+        'row':    'index', 'identifier', 'status', 'message', 'completed' and 'total'.
+        'finish': 'summary', the same dict that is returned.
+    on_event is called from the thread running the job.
+
+    Every run is profiled (see RunProfiler). With config['profile_path'] the profile
+    report is also written there as JSON; config['profile_sample_rate'] and
+    config['profiler'] select the fraction of rows run under cProfile or
+    pyinstrument, whose combined profile is written next to it (.prof or .html).
+
+    With config['previous_output'] the run is incremental: rows of that earlier
+    output are reused while younger than config['refresh_after'] seconds,
+    revalidated with a conditional GET when older, and only new or moved
+    products are scraped from scratch (see refresh_identifier()). The output
+    then has change tracking columns (TRACKING_COLUMNS), which can also be
+    requested for a full run with config['track_changes'].
+
+    Args:
+        input_path (str): The identifier sheet.
+        config (dict): The manufacturer configuration.
+        output_path (str, optional): Where to write the results.
+        on_event (callable, optional): Progress subscriber.
+        profiler (RunProfiler, optional): Profiler to record into. Defaults to a new one built from the config.
+        engine (FetchEngine, optional): Fetch engine shared with other jobs. Its session, limiter, retry policy
+            and cache are used instead of ones built from this config, and the 'http', 'cache', 'retries' and
+            'hosts' counters in the summary are engine-wide. Defaults to a new engine, closed when the job ends.
 
     Returns:
-        list: A list of image URLs.
+        dict: 'rows', 'ok', 'output', 'elapsed' seconds, 'http' session counters, 'cache'
+        counters (or None), 'retries' counters, per-host limiter state in 'hosts', 'memo'
+        hit/miss counters (or None), the RunProfiler report in 'profile', counts of each
+        row 'changes' state when changes are tracked and, unless streaming, the result 'dataframe'.
+
+    Raises:
+        ValueError: If the configuration or input is invalid.
+        FileNotFoundError: If the input file does not exist.
     """
-    if not selector:
-        return []
+    validate_config(config)
+    if config.get('streaming') and not output_path:
+        raise ValueError("Streaming mode needs an output path.")
+
+    start_time = time.time()
+    profiler = profiler or RunProfiler(sample_rate=config.get('profile_sample_rate', 0),
+                                       backend=config.get('profiler', 'cprofile'))
+    on_event = profiler.event_hook(on_event)
+    owns_engine = engine is None
+    if owns_engine:
+        engine = FetchEngine(config)
+    session, limiter, retry_policy, cache = engine.session, engine.limiter, engine.retry_policy, engine.cache
+    memo = RunMemo.from_config(config)
+    extraction_pool = None
     try:
-        if method == 'xpath':
-            tree = etree.HTML(html_content)
-            img_elements = tree.xpath(selector)
-            return [urljoin(base_url if base_url else urlparse(url).scheme + "://" + urlparse(url).netloc, img) for img in img_elements if img]
-        elif method == 'css':
-            soup = BeautifulSoup(html_content, 'html.parser')
-            img_elements = soup.select(selector)
-            return [urljoin(base_url if base_url else urlparse(url).scheme + "://" + urlparse(url).netloc, img['src']) for img in img_elements if 'src' in img.attrs]
+        previous = load_previous_output(config['previous_output'], config) if config.get('previous_output') else None
+        if config.get('parse_workers'):
+            extraction_pool = ExtractionPool(config, config['parse_workers'])
+        if config.get('streaming'):
+            _emit(on_event, 'start', total=None, resumed=0)
+            summary = stream_manufacturer(input_path, output_path, config, chunksize=config.get('chunksize', 1000),
+                                          on_event=on_event, session=session, cache=cache,
+                                          limiter=limiter, retry_policy=retry_policy, memo=memo,
+                                          extraction_pool=extraction_pool, profiler=profiler, previous=previous)
         else:
-            return []
-    except (etree.XPathEvalError, Exception) as e:
-        print(f"Error during image link extraction ({method}): {e}")
-        return []
+            df = read_input(input_path)
+            summary = scrape_dataframe(df, config, on_event=on_event, session=session, cache=cache,
+                                       limiter=limiter, retry_policy=retry_policy, memo=memo,
+                                       extraction_pool=extraction_pool, profiler=profiler, previous=previous)
+            if output_path:
+                with profiler.stage('output_write'):
+                    write_output(df, output_path)
+            summary['dataframe'] = df
+        summary['output'] = output_path
+        summary.update(engine.stats())
+        summary['memo'] = memo.stats() if memo else None
+    finally:
+        if owns_engine:
+            engine.close()
+        if extraction_pool:
+            extraction_pool.close()
+    summary['elapsed'] = time.time() - start_time
+    summary['profile'] = profiler.report()
+    if config.get('profile_path'):
+        profiler.export_json(config['profile_path'])
+        extension = '.html' if profiler.backend == 'pyinstrument' else '.prof'
+        profiler.export_sampled_profile(os.path.splitext(config['profile_path'])[0] + extension)
+    _emit(on_event, 'finish', summary=summary)
+    return summary
 
-def get_html_content(url, progress_callback=None):
-    """Fetches HTML content with potential retries."""
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'}
-    max_retries = 3
-    retry_delay = 5  # seconds
+def format_summary(summary):
+    """Returns a short human readable report of a process_manufacturer() summary."""
+    lines = [f"{summary['rows']} rows processed, {summary['ok']} found, in {summary['elapsed']:.1f}s"]
+    http = summary.get('http')
+    if http:
+        lines.append(f"HTTP requests: {http['requests']}, connections opened: {http['connections_opened']}, "
+                     f"reused: {http['connections_reused']}")
+    changes = summary.get('changes')
+    if changes:
+        lines.append(f"Changes: {changes['new']} new, {changes['changed']} changed, {changes['unchanged']} unchanged, "
+                     f"{changes['fresh']} skipped as fresh")
+    memo = summary.get('memo')
+    if memo:
+        for page in ('search', 'product'):
+            lines.append(f"{page.capitalize()} pages: {memo[page]['misses']} fetched, {memo[page]['hits']} memo hits, "
+                         f"{memo[page]['shared']} shared in-flight")
+    retries = summary.get('retries')
+    if retries and (retries['retries'] or retries['budget_exhausted']):
+        lines.append(f"Retries: {retries['retries']}" +
+                     (f" (retry budget exhausted {retries['budget_exhausted']} times)" if retries['budget_exhausted'] else ""))
+    cache = summary.get('cache')
+    if cache:
+        lines.append(f"Cache hits: {cache['hits']} ({cache['revalidated']} revalidated), misses: {cache['misses']}, "
+                     f"size: {cache['bytes'] / (1024 * 1024):.1f} MB")
+    return "\n".join(lines)
 
-    for attempt in range(max_retries):
+JOB_FIELDS = ('name', 'config', 'input', 'output')
+
+def load_job_file(path):
+    """
+    Loads a multi-manufacturer job file for run_jobs().
+
+    The file is a JSON object with a "jobs" list and optional "settings" and
+    "max_concurrent_jobs". Each job names a manufacturer config (a JSON file
+    path or an inline object), an input sheet and an output file; relative
+    paths are resolved against the job file's folder. Any other keys of a job
+    override its config. "settings" configure the shared fetch engine (the
+    keys in ENGINE_CONFIG_FIELDS) and provide defaults for every job's config
+    (all other keys).
+
+    Returns:
+        dict: 'jobs' (list of dicts with 'name', 'config', 'input' and 'output'), 'settings' and 'max_concurrent_jobs'.
+
+    Raises:
+        ValueError: If the file or a job entry is malformed.
+    """
+    with open(path, encoding='utf-8') as f:
+        job_file = json.load(f)
+    if not isinstance(job_file, dict) or not isinstance(job_file.get('jobs'), list) or not job_file['jobs']:
+        raise ValueError(f"Job file '{path}' must contain a JSON object with a non-empty \"jobs\" list.")
+    folder = os.path.dirname(os.path.abspath(path))
+
+    def resolve(value):
+        return value if os.path.isabs(value) else os.path.join(folder, value)
+
+    settings = job_file.get('settings', {})
+    defaults = {key: value for key, value in settings.items() if key not in ENGINE_CONFIG_FIELDS}
+    jobs = []
+    for number, entry in enumerate(job_file['jobs'], start=1):
+        if not isinstance(entry, dict) or not all(entry.get(field) for field in ('config', 'input', 'output')):
+            raise ValueError(f"Job {number} in '{path}' needs 'config', 'input' and 'output'.")
+        if isinstance(entry['config'], dict):
+            name = entry.get('name', f"job{number}")
+            config = dict(defaults, **entry['config'])
+        else:
+            name = entry.get('name', os.path.splitext(os.path.basename(entry['config']))[0])
+            config = dict(defaults, **load_config_file(resolve(entry['config'])))
+        config.update({key: value for key, value in entry.items() if key not in JOB_FIELDS})
+        jobs.append({'name': name, 'config': config, 'input': resolve(entry['input']), 'output': resolve(entry['output'])})
+    return {'jobs': jobs, 'settings': settings, 'max_concurrent_jobs': job_file.get('max_concurrent_jobs')}
+
+def run_jobs(jobs, settings=None, on_event=None, max_concurrent_jobs=None):
+    """
+    Runs several manufacturer jobs concurrently in one process, sharing one FetchEngine.
+
+    All jobs draw from the engine's global concurrency cap and connection pools,
+    so requests to different manufacturers interleave while each host's
+    concurrency and rate limits are respected. A job whose own config sets
+    'max_per_host' or 'rate_per_host' gets those limits for its hosts. Each job
+    runs max_workers worker threads (default: its per-host limit), so a slow or
+    throttled manufacturer does not hold back the others. A job that fails
+    (e.g. a missing input file) is reported and the other jobs carry on.
+
+    Progress events are those of process_manufacturer() with an added 'job'
+    name; 'row' events also carry 'overall_completed' and 'overall_total'
+    (None until every job has started, or when a job is streaming). A failed
+    job emits {'type': 'job_error', 'job', 'error'} and the end of the whole
+    run emits {'type': 'jobs_finish', 'summary'}. on_event is called from the
+    job threads, possibly concurrently.
+
+    Args:
+        jobs (list): Dicts with 'name', 'config', 'input' and 'output', as returned by load_job_file().
+        settings (dict, optional): Fetch engine settings (see ENGINE_CONFIG_FIELDS).
+        on_event (callable, optional): Progress subscriber.
+        max_concurrent_jobs (int, optional): Jobs running at the same time. Defaults to all of them.
+
+    Returns:
+        dict: Per-job summaries in 'jobs', error messages of failed jobs in 'errors', total 'rows'
+        and 'ok', 'elapsed' seconds and the engine-wide 'http', 'cache', 'retries' and 'hosts' counters.
+
+    Raises:
+        ValueError: If job names repeat or a job's configuration is invalid (raised before any request is made).
+    """
+    names = [job['name'] for job in jobs]
+    if len(set(names)) != len(names):
+        raise ValueError("Job names must be unique.")
+    for job in jobs:
         try:
-            if progress_callback:
-                progress_callback(f"Fetching HTML from: {url} (Attempt {attempt + 1}/{max_retries})", 20)
-            response = requests.get(url, headers=headers, verify=False, timeout=15)
-            response.raise_for_status()
-            if progress_callback:
-                progress_callback("HTML fetched successfully.", 40)
-            return response.content
-        except requests.exceptions.RequestException as e:
-            error_message = f"Error fetching HTML from {url} (Attempt {attempt + 1}/{max_retries}): {e}"
-            if attempt < max_retries - 1:
-                print(f"{error_message}. Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-            else:
-                if progress_callback:
-                    progress_callback(error_message, 100)
-                print(error_message)
-                return None
-        except Exception as e:
-            error_message = f"An error occurred while getting HTML from {url}: {e}"
-            if progress_callback:
-                progress_callback(error_message, 100)
-            print(error_message)
-            return None
-    return None
+            validate_config(job['config'])
+        except ValueError as e:
+            raise ValueError(f"Job '{job['name']}': {e}") from e
 
-def process_manufacturer(excel_file, config, progress_var, progress_percent_label, status_label, root):
-    try:
-        df = pd.read_excel(excel_file)
-        mpn_column = config.get('mpn_column')
-        search_url_format = config.get('search_url_format')
-        product_link_selector = config.get('product_link_selector')
-        product_link_selector_type = config.get('product_link_selector_type', 'xpath')
-        product_link_base_url = config.get('product_link_base_url')
-        family_selector = config.get('family_selector')
-        family_selector_type = config.get('family_selector_type', 'xpath')
-        image_selector = config.get('image_selector')
-        image_selector_type = config.get('image_selector_type', 'xpath')
-        output_prefix = config.get('output_prefix', 'Product')
-
-        if not all([mpn_column, search_url_format, product_link_selector]):
-            error_message = "Error: Configuration is missing required fields (mpn_column, search_url_format, product_link_selector)."
-            messagebox.showerror("Error", error_message)
-            status_label.config(text=error_message, foreground="red")
-            return
+    settings = dict(settings or {})
+    settings.setdefault('max_hosts', max(10, 2 * len(jobs)))
+    # Size the shared connection pools for the highest per-host limit any job asks for.
+    settings.setdefault('pool_size', max([settings.get('max_per_host', 4)] +
+                                         [job['config'].get('max_per_host') or 0 for job in jobs]))
+    lock = threading.Lock()
+    totals = {}
+    completed = {}
 
-        if mpn_column not in df.columns:
-            error_message = f"Error: MPN Column '{mpn_column}' not found in the Excel file."
-            messagebox.showerror("Error", error_message)
-            status_label.config(text=error_message, foreground="red")
-            return
+    def job_events(name):
+        def forward(event):
+            with lock:
+                if event['type'] == 'start':
+                    totals[name] = event['total']
+                    completed[name] = event['resumed']
+                elif event['type'] == 'row':
+                    completed[name] = event['completed']
+                    known = len(totals) == len(jobs) and None not in totals.values()
+                    event = dict(event, overall_completed=sum(completed.values()),
+                                 overall_total=sum(totals.values()) if known else None)
+            if on_event:
+                on_event(dict(event, job=name))
+        return forward
 
-        total_items = len(df[mpn_column])
-        extracted_data = {
-            f'{output_prefix} Link': [None] * total_items,
-            'Family': [None] * total_items,
-            'Image Links': [[]] * total_items
-        }
+    def run(job, engine):
+        config = dict(job['config'])
+        config.setdefault('max_workers', config.get('max_per_host') or engine.limiter.max_per_host)
+        summary = process_manufacturer(job['input'], config, output_path=job['output'],
+                                       on_event=job_events(job['name']), engine=engine)
+        summary.pop('dataframe', None)
+        return summary
 
-        for index, identifier in enumerate(df[mpn_column]):
-            try:
-                search_url = search_url_format.format(mpn=identifier) # Assuming 'mpn' is the generic identifier key
-                progress_text = f"Processing Identifier: {identifier} ({index + 1}/{total_items})"
-                status_label.config(text=progress_text, foreground="blue")
-                progress_percent = int(((index + 1) / total_items) * 20)
-                progress_var.set(progress_percent)
-                progress_percent_label.config(text=f"{progress_percent}%")
-                root.update()
-
-                html_search_content = get_html_content(search_url,
-                                                       progress_callback=lambda msg, p: status_label.config(text=f"Processing {identifier}: Searching - {msg}", foreground="blue"))
-
-                if html_search_content:
-                    product_link = extract_link(html_search_content, product_link_selector_type, product_link_selector, product_link_base_url, search_url,
-                                                progress_callback=lambda msg, p: status_label.config(text=f"Processing {identifier}: Finding Product Link - {msg}", foreground="blue"))
-                    extracted_data[f'{output_prefix} Link'][index] = product_link
-
-                    if pd.notna(product_link):
-                        html_product_content = get_html_content(product_link,
-                                                               progress_callback=lambda msg, p: status_label.config(text=f"Processing {identifier}: Fetching Product Page - {msg}", foreground="blue"))
-                        if html_product_content:
-                            if family_selector:
-                                family_data = extract_data(html_product_content, family_selector_type, family_selector)
-                                extracted_data['Family'][index] = " > ".join(family_data) if family_data else None
-
-                            if image_selector:
-                                image_links = extract_image_links(html_product_content, image_selector_type, image_selector, urlparse(product_link).scheme + "://" + urlparse(product_link).netloc, product_link)
-                                extracted_data['Image Links'][index] = image_links
-
-                            status_label.config(text=f"Processing {identifier}: Product page fetched and data extracted.", foreground="green")
-                            progress_percent = int(((index + 1) / total_items) * 80)
-                            progress_var.set(progress_percent)
-                            progress_percent_label.config(text=f"{progress_percent}%")
-                            root.update()
-                        else:
-                            status_label.config(text=f"Processing {identifier}: Failed to fetch product page.", foreground="orange")
-                    else:
-                        status_label.config(text=f"Processing {identifier}: Product link not found.", foreground="orange")
-                else:
-                    status_label.config(text=f"Processing Identifier: {identifier} - Could not retrieve search results.", foreground="orange")
+    start_time = time.time()
+    results = {}
+    errors = {}
+    with FetchEngine(settings) as engine:
+        for job in jobs:
+            engine.configure_job(job['config'])
+        with ThreadPoolExecutor(max_workers=max_concurrent_jobs or len(jobs)) as executor:
+            futures = {executor.submit(run, job, engine): job['name'] for job in jobs}
+            for future in as_completed(futures):
+                name = futures[future]
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    errors[name] = str(e)
+                    print(f"Job '{name}' failed: {e}")
+                    _emit(on_event, 'job_error', job=name, error=str(e))
+        summary = engine.stats()
+    summary['jobs'] = {name: results[name] for name in names if name in results}
+    summary['errors'] = errors
+    summary['rows'] = sum(result['rows'] for result in results.values())
+    summary['ok'] = sum(result['ok'] for result in results.values())
+    summary['elapsed'] = time.time() - start_time
+    _emit(on_event, 'jobs_finish', summary=summary)
+    return summary
 
-                time.sleep(0.1)
+def format_jobs_summary(summary):
+    """Returns a short human readable report of a run_jobs() summary."""
+    lines = [f"{name}: {result['rows']} rows, {result['ok']} found, in {result['elapsed']:.1f}s -> {result['output']}"
+             for name, result in summary['jobs'].items()]
+    lines.extend(f"{name}: FAILED ({error})" for name, error in summary['errors'].items())
+    lines.append(format_summary(summary))
+    return "\n".join(lines)
 
-            except Exception as e:
-                print(f"Error processing Identifier {identifier}: {e}")
-                status_label.config(text=f"Error processing Identifier {identifier}: {e}", foreground="red")
+class TkProgressReporter:
+    """
+    Thread-safe bridge between process_manufacturer() events and the Tk widgets.
 
-        for col, data in extracted_data.items():
-            df[col] = data
+    The job thread only records the latest event; the Tk main loop polls it
+    with root.after() every interval_ms, so widgets are touched from the main
+    thread only and at most a few times per second. Widget updates are timed
+    as the 'gui_update' stage of the profiler, when one is set.
+    """
 
-        max_images = max(len(links) for links in extracted_data['Image Links']) if extracted_data['Image Links'] else 0
-        for i in range(max_images):
-            df[f"Image Link {i+1}"] = [links[i] if len(links) > i else None for links in extracted_data['Image Links']]
+    def __init__(self, root, progress_var, progress_percent_label, status_label, interval_ms=200, profiler=None):
+        self.root = root
+        self.progress_var = progress_var
+        self.progress_percent_label = progress_percent_label
+        self.status_label = status_label
+        self.interval_ms = interval_ms
+        self.profiler = profiler
+        self._lock = threading.Lock()
+        self._latest = None
+        self._finished = False
 
-        output_excel_file = filedialog.asksaveasfilename(defaultextension=".xlsx",
-                                                        initialfile="Output_extracted_data.xlsx",
-                                                        title="Save Output Excel File")
-        if output_excel_file:
-            df.to_excel(output_excel_file, index=False)
-            success_message = f"Data extracted and saved to '{output_excel_file}'"
-            status_label.config(text=success_message, foreground="green")
-            messagebox.showinfo("Success", success_message)
+    def __call__(self, event):
+        with self._lock:
+            if event['type'] == 'row':
+                self._latest = event
+
+    def start(self):
+        self._poll()
+
+    def stop(self):
+        self._finished = True
+
+    def _show(self, event):
+        colors = {'ok': "green", 'error': "red"}
+        if event['total']:
+            progress_text = f"{event['message']} ({event['completed']}/{event['total']})"
+            progress_percent = int((event['completed'] / event['total']) * 100)
+            self.progress_var.set(progress_percent)
+            self.progress_percent_label.config(text=f"{progress_percent}%")
         else:
-            status_label.config(text="Saving cancelled.", foreground="orange")
+            progress_text = f"{event['message']} ({event['completed']} rows done)"
+        self.status_label.config(text=progress_text, foreground=colors.get(event['status'], "orange"))
 
-    except FileNotFoundError:
-        error_message = f"Error: Excel file '{excel_file}' not found."
-        messagebox.showerror("Error", error_message)
-        status_label.config(text=error_message, foreground="red")
+    def _poll(self):
+        with self._lock:
+            event, self._latest = self._latest, None
+        if event:
+            with _profile_stage(self.profiler, 'gui_update'):
+                self._show(event)
+        if not self._finished:
+            self.root.after(self.interval_ms, self._poll)
+
+def run_gui_job(input_file, config, output_file, reporter):
+    """Thread target for the GUI: runs the job, then hands the outcome back to the Tk main loop."""
+    try:
+        summary = process_manufacturer(input_file, config, output_path=output_file, on_event=reporter,
+                                       profiler=reporter.profiler)
+        print(format_summary(summary))
+        root.after(0, finish_gui_job, summary, None, reporter)
     except Exception as e:
-        error_message = f"An unexpected error occurred: {e}"
-        messagebox.showerror("Error", error_message)
-        status_label.config(text=error_message, foreground="red")
+        root.after(0, finish_gui_job, None, e, reporter)
+
+def finish_gui_job(summary, error, reporter):
+    reporter.stop()
+    try:
+        if isinstance(error, FileNotFoundError):
+            error_message = f"Error: Input file '{excel_file_path_global}' not found."
+            messagebox.showerror("Error", error_message)
+            status_label.config(text=error_message, foreground="red")
+        elif isinstance(error, ValueError):
+            error_message = f"Error: {error}"
+            messagebox.showerror("Error", error_message)
+            status_label.config(text=error_message, foreground="red")
+        elif error:
+            error_message = f"An unexpected error occurred: {error}"
+            messagebox.showerror("Error", error_message)
+            status_label.config(text=error_message, foreground="red")
+        elif summary.get('dataframe') is not None:
+            output_excel_file = filedialog.asksaveasfilename(defaultextension=".xlsx",
+                                                            initialfile="Output_extracted_data.xlsx",
+                                                            title="Save Output Excel File")
+            if output_excel_file:
+                write_output(summary['dataframe'], output_excel_file)
+                success_message = f"Data extracted and saved to '{output_excel_file}'"
+                status_label.config(text=success_message, foreground="green")
+                messagebox.showinfo("Success", success_message)
+            else:
+                status_label.config(text="Saving cancelled.", foreground="orange")
+        else:
+            success_message = f"{summary['rows']} rows ({summary['ok']} found) written to '{summary['output']}'"
+            status_label.config(text=success_message, foreground="green")
+            messagebox.showinfo("Success", success_message)
     finally:
         progress_var.set(0)
         progress_percent_label.config(text="0%")
         browse_button.config(state=tk.NORMAL)
         start_process_button.config(state=tk.NORMAL)
 
+class ConsoleProgressReporter:
+    """Prints process_manufacturer() and run_jobs() progress to stderr, at most once per interval seconds."""
+
+    def __init__(self, interval=1.0, stream=None):
+        self.interval = interval
+        self.stream = stream or sys.stderr
+        self._last_report = 0.0
+
+    def __call__(self, event):
+        job = f"{event['job']}: " if event.get('job') else ""
+        if event['type'] == 'start' and event['resumed']:
+            print(f"{job}Resuming: {event['resumed']} rows restored from the journal.", file=self.stream)
+        elif event['type'] == 'row':
+            now = time.time()
+            if now - self._last_report < self.interval and event['completed'] != event['total']:
+                return
+            self._last_report = now
+            total = f"/{event['total']}" if event['total'] else ""
+            overall = ""
+            if 'overall_completed' in event:
+                overall_total = f"/{event['overall_total']}" if event['overall_total'] else ""
+                overall = f" [overall {event['overall_completed']}{overall_total}]"
+            print(f"{job}[{event['completed']}{total}] {event['message']}{overall}", file=self.stream)
+        elif event['type'] == 'finish' and job:
+            print(f"{job}finished: {event['summary']['rows']} rows, {event['summary']['ok']} found.", file=self.stream)
+
+def load_config_file(path):
+    """Loads a manufacturer configuration (the same keys load_config() produces) from a JSON file."""
+    with open(path, encoding='utf-8') as f:
+        config = json.load(f)
+    if not isinstance(config, dict):
+        raise ValueError(f"Config file '{path}' must contain a JSON object.")
+    return config
+
+def build_arg_parser():
+    parser = argparse.ArgumentParser(
+        description="Generalized Product Data Extractor. Run without arguments to open the GUI.")
+    parser.add_argument("--config", help="JSON file with the manufacturer configuration.")
+    parser.add_argument("--input", help="Identifier sheet (.xlsx, .csv or .parquet).")
+    parser.add_argument("--output", help="Output file (.xlsx, .csv, .jsonl or .parquet).")
+    parser.add_argument("--jobs", help="JSON job file listing several manufacturers to run concurrently "
+                                       "(instead of --config, --input and --output).")
+    parser.add_argument("--max-concurrent-jobs", type=int, help="Jobs from --jobs running at the same time.")
+    parser.add_argument("--streaming", action="store_true", default=None, help="Read and write in chunks (large sheets).")
+    parser.add_argument("--chunksize", type=int, help="Rows per chunk in streaming mode.")
+    parser.add_argument("--max-images", type=int, help="Number of image columns in streaming mode (default 10); extra images are dropped.")
+    parser.add_argument("--max-workers", type=int, help="Maximum concurrent requests.")
+    parser.add_argument("--max-per-host", type=int, help="Maximum concurrent requests per host.")
+    parser.add_argument("--request-delay", type=float, help="Pause in seconds after each identifier, per worker.")
+    parser.add_argument("--rate-per-host", type=float, help="Maximum requests per second to each host.")
+    parser.add_argument("--max-retries", type=int, help="Attempts per page, including the first.")
+    parser.add_argument("--retry-budget", type=int, help="Total retries allowed in the run.")
+    parser.add_argument("--cache", dest="cache_path", help="SQLite response cache file.")
+    parser.add_argument("--cache-ttl", type=float, help="Seconds a cached page stays fresh.")
+    parser.add_argument("--offline", action="store_true", default=None, help="Serve pages from the cache only.")
+    parser.add_argument("--journal", dest="journal_path", help="JSONL checkpoint journal file.")
+    parser.add_argument("--resume", action="store_true", default=None, help="Resume from the journal.")
+    parser.add_argument("--parse-workers", type=int,
+                        help="Parse pages in this many worker processes (0 parses on the fetch threads).")
+    parser.add_argument("--stream-search", action="store_true", default=None,
+                        help="Parse search pages while downloading and stop at the first product link.")
+    parser.add_argument("--no-memoize", dest="memoize", action="store_const", const=False, default=None,
+                        help="Fetch every row's pages even if another row already fetched the same URL.")
+    parser.add_argument("--previous-output",
+                        help="Output of an earlier run: only new, stale or changed products are fetched again.")
+    parser.add_argument("--refresh-after", type=float,
+                        help="Seconds a row of --previous-output stays fresh and is reused without any request.")
+    parser.add_argument("--track-changes", action="store_true", default=None,
+                        help="Add the Scraped At / Page ETag / Content Hash / Change columns needed for later incremental runs.")
+    parser.add_argument("--profile", dest="profile_path",
+                        help="Write per-stage timings (p50/p95/p99, histograms, throughput) to this JSON file.")
+    parser.add_argument("--profile-sample-rate", type=float,
+                        help="Fraction of rows (0-1) to run under the sampling profiler; saved next to --profile.")
+    parser.add_argument("--profiler", choices=("cprofile", "pyinstrument"), help="Sampling profiler backend.")
+    parser.add_argument("--quiet", action="store_true", help="Do not print progress.")
+    return parser
+
+CLI_OVERRIDE_FIELDS = ('streaming', 'chunksize', 'max_images', 'max_workers', 'max_per_host', 'request_delay',
+                       'rate_per_host', 'max_retries', 'retry_budget', 'memoize', 'parse_workers', 'cache_path', 'cache_ttl',
+                       'offline', 'journal_path', 'resume', 'profile_path', 'profile_sample_rate', 'profiler',
+                       'previous_output', 'refresh_after', 'track_changes', 'stream_search')
+
+def run_job_file(args, overrides):
+    """Runs the --jobs job file. Command line overrides go to the shared engine and to every job. Returns the exit code."""
+    try:
+        job_file = load_job_file(args.jobs)
+        settings = dict(job_file['settings'], **overrides)
+        for job in job_file['jobs']:
+            job['config'].update({key: value for key, value in overrides.items() if key not in ENGINE_CONFIG_FIELDS})
+        summary = run_jobs(job_file['jobs'], settings, on_event=None if args.quiet else ConsoleProgressReporter(),
+                           max_concurrent_jobs=args.max_concurrent_jobs or job_file['max_concurrent_jobs'])
+    except (ValueError, FileNotFoundError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    print(format_jobs_summary(summary))
+    return 1 if summary['errors'] else 0
+
+def main(argv=None):
+    """Command line entry point. Returns the process exit code."""
+    parser = build_arg_parser()
+    args = parser.parse_args(argv)
+    overrides = {key: getattr(args, key) for key in CLI_OVERRIDE_FIELDS if getattr(args, key) is not None}
+    if args.jobs:
+        if args.profile_path or args.journal_path or args.previous_output:
+            parser.error("with --jobs, set 'profile_path', 'journal_path' and 'previous_output' per job in the job file.")
+        return run_job_file(args, overrides)
+    if not (args.config and args.input and args.output):
+        parser.error("--config, --input and --output are required unless --jobs is given.")
+    try:
+        config = load_config_file(args.config)
+        config.update(overrides)
+        summary = process_manufacturer(args.input, config, output_path=args.output,
+                                       on_event=None if args.quiet else ConsoleProgressReporter())
+    except (ValueError, FileNotFoundError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    print(format_summary(summary))
+    if args.profile_path:
+        print(format_profile(summary['profile']))
+        print(f"Profile written to '{args.profile_path}'")
+    print(f"Results written to '{args.output}'")
+    return 0
+
+def browse_file():
+    global file_selected
+    global excel_file_path_global
+
+    file_path = filedialog.askopenfilename(title="Select Identifier File",
+                                           filetypes=[("Excel files", "*.xlsx *.xls *.xlsm"), ("CSV files", "*.csv"),
+                                                      ("Parquet files", "*.parquet"), ("All files", "*.*")])
+    if not file_path:
+        return
+    excel_file_path_global = file_path
+    file_selected = True
+    excel_entry.config(state='normal')
+    excel_entry.delete(0, tk.END)
+    excel_entry.insert(0, file_path)
+    excel_entry.config(state='readonly')
+    file_selected_label.config(text=f"Selected: {os.path.basename(file_path)}", foreground="green")
+    start_process_button.config(state=tk.NORMAL)
+
 def load_config():
     config = {}
     config['mpn_column'] = mpn_column_entry.get()
@@ -277,6 +2697,17 @@ def load_config():
     config['image_selector'] = image_selector_entry.get()
     config['image_selector_type'] = image_selector_type_var.get()
     config['output_prefix'] = output_prefix_entry.get()
+    config['max_workers'] = int(max_workers_entry.get())
+    config['max_per_host'] = int(max_per_host_entry.get())
+    config['rate_per_host'] = float(rate_per_host_entry.get()) if rate_per_host_entry.get().strip() else None
+    config['max_retries'] = int(max_retries_entry.get())
+    config['retry_budget'] = int(retry_budget_entry.get()) if retry_budget_entry.get().strip() else None
+    config['cache_path'] = cache_path_entry.get()
+    config['offline'] = offline_var.get()
+    config['journal_path'] = journal_path_entry.get()
+    config['resume'] = resume_var.get()
+    config['streaming'] = streaming_var.get()
+    config['max_images'] = int(max_images_entry.get())
     return config
 
 def start_processing_generalized():
@@ -290,21 +2721,39 @@ def start_processing_generalized():
         messagebox.showerror("Error", "Please select an Excel file.")
         return
 
-    config = load_config()
+    try:
+        config = load_config()
+    except ValueError:
+        messagebox.showerror("Error", "Concurrency, retry and image column settings must be whole numbers and the rate limit a number.")
+        return
 
     if not all([config.get('mpn_column'), config.get('search_url_format'), config.get('product_link_selector')]):
         messagebox.showerror("Error", "Please fill in the required configuration fields.")
         return
 
+    output_file = None
+    if config['streaming']:
+        output_file = filedialog.asksaveasfilename(defaultextension=".csv",
+                                                   initialfile="Output_extracted_data.csv",
+                                                   filetypes=[("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("Parquet", "*.parquet")],
+                                                   title="Save Output File")
+        if not output_file:
+            return
+
     browse_button.config(state=tk.DISABLED)
     start_process_button.config(state=tk.DISABLED)
     status_label.config(text="Processing...", foreground="blue")
-    threading.Thread(target=process_manufacturer, args=(excel_file_path_global, config, progress_var, progress_percent_label, status_label, root)).start()
+    reporter = TkProgressReporter(root, progress_var, progress_percent_label, status_label, profiler=RunProfiler())
+    reporter.start()
+    threading.Thread(target=run_gui_job, args=(excel_file_path_global, config, output_file, reporter), daemon=True).start()
 
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        sys.exit(main())
+
     root = tk.Tk()
     root.title("Generalized Product Data Extractor")
-    root.geometry("750x700")
+    root.geometry("750x1060")
     root.resizable(False, False)
 
     style = ttk.Style()
@@ -381,6 +2830,60 @@ if __name__ == "__main__":
     output_prefix_entry.insert(0, "Product")
     output_prefix_entry.grid(row=9, column=1, padx=10, pady=8, sticky=tk.EW)
 
+    max_workers_label = ttk.Label(config_frame, text="Max Concurrent Requests:")
+    max_workers_label.grid(row=10, column=0, padx=10, pady=8, sticky=tk.W)
+    max_workers_entry = ttk.Entry(config_frame, width=40)
+    max_workers_entry.insert(0, "8")
+    max_workers_entry.grid(row=10, column=1, padx=10, pady=8, sticky=tk.EW)
+
+    max_per_host_label = ttk.Label(config_frame, text="Max Concurrent Requests Per Host:")
+    max_per_host_label.grid(row=11, column=0, padx=10, pady=8, sticky=tk.W)
+    max_per_host_entry = ttk.Entry(config_frame, width=40)
+    max_per_host_entry.insert(0, "4")
+    max_per_host_entry.grid(row=11, column=1, padx=10, pady=8, sticky=tk.EW)
+
+    rate_per_host_label = ttk.Label(config_frame, text="Max Requests Per Second Per Host (optional):")
+    rate_per_host_label.grid(row=12, column=0, padx=10, pady=8, sticky=tk.W)
+    rate_per_host_entry = ttk.Entry(config_frame, width=40)
+    rate_per_host_entry.grid(row=12, column=1, padx=10, pady=8, sticky=tk.EW)
+
+    max_retries_label = ttk.Label(config_frame, text="Max Attempts Per Page:")
+    max_retries_label.grid(row=13, column=0, padx=10, pady=8, sticky=tk.W)
+    max_retries_entry = ttk.Entry(config_frame, width=40)
+    max_retries_entry.insert(0, "3")
+    max_retries_entry.grid(row=13, column=1, padx=10, pady=8, sticky=tk.EW)
+
+    retry_budget_label = ttk.Label(config_frame, text="Retry Budget Per Run (optional):")
+    retry_budget_label.grid(row=14, column=0, padx=10, pady=8, sticky=tk.W)
+    retry_budget_entry = ttk.Entry(config_frame, width=40)
+    retry_budget_entry.grid(row=14, column=1, padx=10, pady=8, sticky=tk.EW)
+
+    cache_path_label = ttk.Label(config_frame, text="Response Cache File (optional):")
+    cache_path_label.grid(row=15, column=0, padx=10, pady=8, sticky=tk.W)
+    cache_path_entry = ttk.Entry(config_frame, width=40)
+    cache_path_entry.grid(row=15, column=1, padx=10, pady=8, sticky=tk.EW)
+    offline_var = tk.BooleanVar(value=False)
+    offline_check = ttk.Checkbutton(config_frame, text="Offline replay (use cached pages only)", variable=offline_var)
+    offline_check.grid(row=16, column=1, padx=10, pady=2, sticky=tk.W)
+
+    journal_path_label = ttk.Label(config_frame, text="Checkpoint Journal File (optional):")
+    journal_path_label.grid(row=17, column=0, padx=10, pady=8, sticky=tk.W)
+    journal_path_entry = ttk.Entry(config_frame, width=40)
+    journal_path_entry.grid(row=17, column=1, padx=10, pady=8, sticky=tk.EW)
+    resume_var = tk.BooleanVar(value=False)
+    resume_check = ttk.Checkbutton(config_frame, text="Resume previous run (retry only failed identifiers)", variable=resume_var)
+    resume_check.grid(row=18, column=1, padx=10, pady=2, sticky=tk.W)
+
+    streaming_var = tk.BooleanVar(value=False)
+    streaming_check = ttk.Checkbutton(config_frame, text="Streaming mode (large sheets: write CSV/JSONL/Parquet while scraping)", variable=streaming_var)
+    streaming_check.grid(row=19, column=1, padx=10, pady=2, sticky=tk.W)
+
+    max_images_label = ttk.Label(config_frame, text="Image Columns (streaming mode):")
+    max_images_label.grid(row=20, column=0, padx=10, pady=8, sticky=tk.W)
+    max_images_entry = ttk.Entry(config_frame, width=40)
+    max_images_entry.insert(0, str(STREAMING_MAX_IMAGES))
+    max_images_entry.grid(row=20, column=1, padx=10, pady=8, sticky=tk.EW)
+
     start_process_button_frame = ttk.Frame(root, padding=10)
     start_process_button_frame.pack(fill=tk.X, padx=20, pady=5)
     start_process_button = ttk.Button(start_process_button_frame, text="3. Start Data Extraction", state=tk.DISABLED,
@@ -0,0 +1,48 @@
+"""
+Measures scraping throughput (rows/sec) at different concurrency levels.
+
+Runs iter_scrape_results() against the local mock site, so the numbers reflect
+the fetch engine rather than a real manufacturer's servers.
+
+Usage:
+    python benchmarks/bench_concurrency.py --rows 200 --latency 0.05 --levels 1 4 8 16
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Product_Data_Scraper import HttpSession, iter_scrape_results  # noqa: E402
+from mock_site import MockSite  # noqa: E402
+
+
+def run(rows, latency, levels, max_per_host):
+    identifiers = [f"MPN-{i:05d}" for i in range(rows)]
+    with MockSite(latency=latency) as site:
+        config = site.config()
+        print(f"{'workers':>8} {'rows':>6} {'seconds':>8} {'rows/sec':>9} {'conns':>6} {'reused':>7}")
+        for workers in levels:
+            per_host = workers if max_per_host is None else max_per_host
+            with HttpSession(pool_size=per_host) as session:
+                start = time.perf_counter()
+                results = list(iter_scrape_results(identifiers, config, max_workers=workers, max_per_host=per_host,
+                                                   request_delay=0, session=session))
+                elapsed = time.perf_counter() - start
+                stats = session.stats()
+            failed = sum(1 for _, _, result in results if result['status'] != 'ok')
+            note = f"  ({failed} failed)" if failed else ""
+            print(f"{workers:>8} {len(results):>6} {elapsed:>8.2f} {len(results) / elapsed:>9.1f} "
+                  f"{stats['connections_opened']:>6} {stats['connections_reused']:>7}{note}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200, help="Number of identifiers to scrape per level.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Mock server latency per request, in seconds.")
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 4, 8, 16], help="Worker counts to benchmark.")
+    parser.add_argument("--max-per-host", type=int, default=None,
+                        help="Per-host cap. Defaults to the worker count, since the mock site is a single host.")
+    args = parser.parse_args()
+    run(args.rows, args.latency, args.levels, args.max_per_host)
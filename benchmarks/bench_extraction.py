@@ -0,0 +1,100 @@
+"""
+Measures how product page extraction scales with the number of parse worker processes.
+
+Simulates the fetch stage with a pool of threads that hand page bytes to the
+extraction stage, exactly as scrape_identifier() does. Level 0 parses on the
+fetch threads themselves (the default, GIL-bound); levels >= 1 use an
+ExtractionPool with that many processes.
+
+Usage:
+    python benchmarks/bench_extraction.py --pages-dir saved_pages/ --levels 0 1 2 4 8
+    python benchmarks/bench_extraction.py --filler-rows 2000 --pages 200 --method css
+
+Without --pages-dir, synthetic product pages from the mock site are used.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Product_Data_Scraper import ExtractionPool, extract_product_page  # noqa: E402
+from mock_site import product_page  # noqa: E402
+
+SELECTORS = {
+    'xpath': {'family_selector': "//ul[@class='breadcrumb']/li", 'family_selector_type': 'xpath',
+              'image_selector': "//img[@class='product-image']/@src", 'image_selector_type': 'xpath'},
+    'css': {'family_selector': "table.specs td.value", 'family_selector_type': 'css',
+            'image_selector': "img.product-image", 'image_selector_type': 'css'},
+}
+
+
+def run_level(pages, config, parse_workers, fetch_threads):
+    product_link = "http://localhost/product/1"
+    if parse_workers:
+        pool = ExtractionPool(config, parse_workers)
+        pool.product_page(pages[0], product_link)  # start the worker processes before timing
+        extract = pool.product_page
+    else:
+        pool = None
+
+        def extract(html_content, link):
+            return extract_product_page(html_content, link, config)
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=fetch_threads) as executor:
+            results = list(executor.map(lambda page: extract(page, product_link), pages))
+        elapsed = time.perf_counter() - start
+    finally:
+        if pool:
+            pool.close()
+    assert all(result['family'] for result in results), "selectors matched nothing; check --family-selector"
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages-dir", help="Directory of saved product pages (*.html).")
+    parser.add_argument("--filler-rows", type=int, default=1000, help="Size of synthetic pages, in specification rows.")
+    parser.add_argument("--pages", type=int, default=200, help="Number of synthetic pages.")
+    parser.add_argument("--levels", type=int, nargs="+", default=[0, 1, 2, 4],
+                        help="Parse worker process counts to benchmark (0 = parse on fetch threads).")
+    parser.add_argument("--fetch-threads", type=int, default=16, help="Threads feeding pages to the extraction stage.")
+    parser.add_argument("--method", choices=["xpath", "css"], default="xpath")
+    parser.add_argument("--family-selector", help="Override the family selector for saved pages.")
+    parser.add_argument("--image-selector", help="Override the image selector for saved pages.")
+    args = parser.parse_args()
+
+    if args.pages_dir:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(args.pages_dir, "*.html"))):
+            with open(path, "rb") as f:
+                pages.append(f.read())
+    else:
+        pages = [product_page(f"MPN-{i:05d}", args.filler_rows).encode("utf-8") for i in range(args.pages)]
+    if not pages:
+        sys.exit("No pages to benchmark.")
+
+    config = dict(SELECTORS[args.method])
+    if args.family_selector:
+        config['family_selector'] = args.family_selector
+    if args.image_selector:
+        config['image_selector'] = args.image_selector
+
+    print(f"{len(pages)} pages, {sum(len(p) for p in pages) / len(pages) / 1024:.1f} KiB average, "
+          f"{os.cpu_count()} CPUs, {args.fetch_threads} fetch threads")
+    print(f"{'workers':>8} {'seconds':>8} {'pages/sec':>10} {'speedup':>8}")
+    baseline = None
+    for workers in args.levels:
+        elapsed = run_level(pages, config, workers, args.fetch_threads)
+        baseline = baseline or elapsed
+        label = "threads" if workers == 0 else str(workers)
+        print(f"{label:>8} {elapsed:>8.2f} {len(pages) / elapsed:>10.1f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Compares parse + extract CPU time per product page, before and after the
+shared ParsedDocument.
+
+"before" re-implements the original extractors: every extractor parses the
+page itself, and CSS selectors go through BeautifulSoup's html.parser.
+"after" parses the page once with lxml and runs every extractor on that tree.
+
+Usage:
+    python benchmarks/bench_parsing.py --pages-dir saved_pages/ --method css
+    python benchmarks/bench_parsing.py --filler-rows 500 --repeat 50
+
+Without --pages-dir, synthetic product pages from the mock site are used.
+Saved pages must match the selectors given with --family-selector/--image-selector.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+from urllib.parse import urljoin
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lxml import etree  # noqa: E402
+
+from Product_Data_Scraper import ParsedDocument, extract_data, extract_image_links  # noqa: E402
+from mock_site import product_page  # noqa: E402
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+SELECTORS = {
+    'xpath': ("//ul[@class='breadcrumb']/li", "//img[@class='product-image']/@src"),
+    'css': ("ul.breadcrumb li", "img.product-image"),
+}
+
+
+def before(html_content, method, family_selector, image_selector):
+    if method == 'xpath':
+        family = [e.text.strip() for e in etree.HTML(html_content).xpath(family_selector) if e.text is not None]
+        images = [urljoin("http://localhost", img) for img in etree.HTML(html_content).xpath(image_selector) if img]
+    else:
+        family = [e.get_text(strip=True) for e in BeautifulSoup(html_content, 'html.parser').select(family_selector)]
+        images = [urljoin("http://localhost", img['src']) for img in BeautifulSoup(html_content, 'html.parser').select(image_selector) if 'src' in img.attrs]
+    return family, images
+
+
+def after(html_content, method, family_selector, image_selector):
+    document = ParsedDocument(html_content)
+    family = extract_data(document, method, family_selector)
+    images = extract_image_links(document, method, image_selector, "http://localhost")
+    return family, images
+
+
+def time_per_page(func, pages, repeat, *args):
+    start = time.process_time()
+    for _ in range(repeat):
+        for page in pages:
+            func(page, *args)
+    return (time.process_time() - start) / (repeat * len(pages))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages-dir", help="Directory of saved product pages (*.html).")
+    parser.add_argument("--filler-rows", type=int, default=300, help="Size of synthetic pages, in specification rows.")
+    parser.add_argument("--pages", type=int, default=20, help="Number of synthetic pages.")
+    parser.add_argument("--repeat", type=int, default=10, help="Times to process the whole corpus.")
+    parser.add_argument("--method", choices=["xpath", "css", "both"], default="both")
+    parser.add_argument("--family-selector", help="Override the family selector for saved pages.")
+    parser.add_argument("--image-selector", help="Override the image selector for saved pages.")
+    args = parser.parse_args()
+
+    if args.pages_dir:
+        pages = []
+        for path in sorted(glob.glob(os.path.join(args.pages_dir, "*.html"))):
+            with open(path, "rb") as f:
+                pages.append(f.read())
+    else:
+        pages = [product_page(f"MPN-{i:05d}", args.filler_rows).encode("utf-8") for i in range(args.pages)]
+    if not pages:
+        sys.exit("No pages to benchmark.")
+
+    methods = ["xpath", "css"] if args.method == "both" else [args.method]
+    print(f"{len(pages)} pages, {sum(len(p) for p in pages) / len(pages) / 1024:.1f} KiB average")
+    print(f"{'method':>7} {'before ms/page':>15} {'after ms/page':>14} {'speedup':>8}")
+    for method in methods:
+        family_selector = args.family_selector or SELECTORS[method][0]
+        image_selector = args.image_selector or SELECTORS[method][1]
+        selector_args = (method, family_selector, image_selector)
+        after_time = time_per_page(after, pages, args.repeat, *selector_args)
+        if method == 'css' and BeautifulSoup is None:
+            print(f"{method:>7} {'n/a (no bs4)':>15} {after_time * 1000:>14.3f} {'':>8}")
+            continue
+        before_time = time_per_page(before, pages, args.repeat, *selector_args)
+        print(f"{method:>7} {before_time * 1000:>15.3f} {after_time * 1000:>14.3f} {before_time / after_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
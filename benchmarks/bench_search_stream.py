@@ -0,0 +1,106 @@
+"""
+Compares the full-page and the streaming search-result step on large search pages.
+
+"full" downloads the whole search page and parses it before taking the first
+product link. "stream" parses while downloading (stream_search_link) and stops
+reading at the first match. Each mode runs in its own process, so the peak
+resident memory of the two does not mix.
+
+Usage:
+    python benchmarks/bench_search_stream.py --filler-rows 20000 --pages 20
+    python benchmarks/bench_search_stream.py --filler-rows 5000 --bandwidth 2000000
+
+The product link is the first result on the mock search page, so the filler rows
+are the part of the page that streaming does not need to download or parse.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Product_Data_Scraper import (HttpSession, RunProfiler, extract_search_link, get_html_content,  # noqa: E402
+                                  stream_search_link)
+from mock_site import MockSite  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(mode, config, pages):
+    """Fetches the search pages in one mode and returns latency, bytes, connection and memory figures."""
+    baseline = peak_rss_mb()
+    profiler = RunProfiler()
+    latencies = []
+    links = 0
+    with HttpSession(pool_size=1) as session:
+        for i in range(pages):
+            url = config['search_url_format'].format(mpn=f"MPN-{i:05d}")
+            start = time.perf_counter()
+            if mode == "full":
+                body = get_html_content(url, session=session, profiler=profiler)
+                found = extract_search_link(body, url, config) if body else None
+            else:
+                found = get_html_content(url, session=session, profiler=profiler,
+                                         consume=lambda response: stream_search_link(response, url, config))
+            latencies.append(time.perf_counter() - start)
+            links += bool(found and found['link'])
+        stats = session.stats()
+    latencies.sort()
+    peak = peak_rss_mb()
+    return {
+        'mode': mode,
+        'pages': pages,
+        'links_found': links,
+        'mean_ms': sum(latencies) / len(latencies) * 1000,
+        'p50_ms': latencies[len(latencies) // 2] * 1000,
+        'kb_read_per_page': profiler.report()['counters'].get('bytes', 0) / pages / 1024,
+        'connections_opened': stats['connections_opened'],
+        'peak_rss_growth_mb': None if peak is None else peak - baseline,
+    }
+
+
+def run(pages, filler_rows, latency, bandwidth):
+    with MockSite(latency=latency, search_filler_rows=filler_rows, bandwidth=bandwidth) as site:
+        config = site.config()
+        print(f"Search page size: {len(site_page_bytes(filler_rows)) / 1024:.0f} KB")
+        print(f"{'mode':>7} {'links':>6} {'mean ms':>8} {'p50 ms':>8} {'KB read':>8} {'conns':>6} {'peak RSS +MB':>13}")
+        for mode in ("full", "stream"):
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker", mode, "--pages", str(pages),
+                                     "--config", json.dumps(config)], capture_output=True, text=True, check=True).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            rss = "n/a" if result['peak_rss_growth_mb'] is None else f"{result['peak_rss_growth_mb']:.1f}"
+            print(f"{mode:>7} {result['links_found']:>6} {result['mean_ms']:>8.1f} {result['p50_ms']:>8.1f} "
+                  f"{result['kb_read_per_page']:>8.0f} {result['connections_opened']:>6} {rss:>13}")
+
+
+def site_page_bytes(filler_rows):
+    from mock_site import search_page
+    return search_page("MPN-00000", filler_rows).encode("utf-8")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=20, help="Search pages fetched per mode.")
+    parser.add_argument("--filler-rows", type=int, default=20000, help="Extra results after the product link on each page.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Mock server latency per request, in seconds.")
+    parser.add_argument("--bandwidth", type=float, default=None, help="Mock server send rate in bytes/sec (default unlimited).")
+    parser.add_argument("--worker", choices=("full", "stream"), help=argparse.SUPPRESS)
+    parser.add_argument("--config", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        print(json.dumps(measure(args.worker, json.loads(args.config), args.pages)))
+    else:
+        run(args.pages, args.filler_rows, args.latency, args.bandwidth)
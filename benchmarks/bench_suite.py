@@ -0,0 +1,270 @@
+"""
+Offline benchmark and regression suite.
+
+Runs micro-benchmarks of extract_link, extract_data and extract_image_links
+(XPath and CSS, small and large pages, from raw bytes and from an already
+parsed page) and end-to-end scenarios that drive the headless
+process_manufacturer() path against the local mock site: plain, large pages,
+streamed search pages, CSS selectors, 5xx errors and 429 throttling.
+Every extracted value is checked against what the mock site serves, and the
+results are written as JSON so that runs of different versions can be compared.
+
+Usage:
+    python benchmarks/bench_suite.py --output results/main.json
+    python benchmarks/bench_suite.py --output results/branch.json --compare results/main.json --max-slowdown 0.2
+    python benchmarks/bench_suite.py --quick
+
+The exit code is 1 if an extraction check failed, a scenario found fewer rows
+than it must (all rows, or a set share for the fault-injection scenarios) or,
+with --max-slowdown, a result is more than that fraction slower (or finds that
+fraction fewer rows) than in the --compare file.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import lxml  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from Product_Data_Scraper import (ParsedDocument, extract_data, extract_image_links, extract_link,  # noqa: E402
+                                  process_manufacturer)
+from mock_site import MockSite, product_page, search_page  # noqa: E402
+
+BASE_URL = "http://localhost"
+MPN = "MPN-00042"
+
+SELECTORS = {
+    'xpath': {'link': "//a[@class='product-link']", 'family': "//ul[@class='breadcrumb']/li",
+              'images': "//img[@class='product-image']/@src"},
+    'css': {'link': "a.product-link", 'family': "ul.breadcrumb li", 'images': "img.product-image"},
+}
+
+PAGE_SIZES = {'small': 0, 'large': 2000}
+
+COMMON_CONFIG = {'max_workers': 8, 'max_per_host': 8, 'backoff_base': 0.05, 'max_retries': 5}
+
+SCENARIOS = [
+    {'name': 'baseline', 'site': {'latency': 0.02}, 'config': {}},
+    {'name': 'css_selectors', 'site': {'latency': 0.02}, 'config': {
+        'product_link_selector': SELECTORS['css']['link'], 'product_link_selector_type': 'css',
+        'family_selector': SELECTORS['css']['family'], 'family_selector_type': 'css',
+        'image_selector': SELECTORS['css']['images'], 'image_selector_type': 'css'}},
+    {'name': 'large_pages', 'site': {'latency': 0.02, 'filler_rows': 2000, 'search_filler_rows': 2000}, 'config': {}},
+    {'name': 'large_pages_stream_search', 'site': {'latency': 0.02, 'filler_rows': 2000, 'search_filler_rows': 2000},
+     'config': {'stream_search': True}},
+    {'name': 'jittery_latency', 'site': {'latency': 0.01, 'latency_jitter': 0.05}, 'config': {}},
+    # With injected faults a few rows may still run out of retries; every other scenario must find every row.
+    {'name': 'server_errors', 'site': {'latency': 0.02, 'error_rate': 0.05}, 'config': {}, 'min_found': 0.9},
+    {'name': 'throttled', 'site': {'latency': 0.02, 'throttle_rate': 0.05, 'retry_after': 0.2}, 'config': {}, 'min_found': 0.9},
+]
+
+
+def expected_result(mpn, base_url):
+    quoted = quote(mpn)
+    return {
+        'link': f"{base_url}/product/{quoted}",
+        'family': ['Products', 'Connectors', mpn],
+        'images': [f"{base_url}/images/{quoted}-1.jpg", f"{base_url}/images/{quoted}-2.jpg"],
+    }
+
+
+def time_call(func, target_seconds):
+    """Returns the best mean seconds per call of func() over 3 rounds of about target_seconds each."""
+    start = time.perf_counter()
+    func()
+    once = max(time.perf_counter() - start, 1e-6)
+    iterations = max(3, int(target_seconds / once))
+    best = None
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        mean = (time.perf_counter() - start) / iterations
+        best = mean if best is None else min(best, mean)
+    return best
+
+
+def run_micro(target_seconds):
+    """Benchmarks each extractor per selector type, page size and input kind, and checks its output."""
+    expected = expected_result(MPN, BASE_URL)
+    url = f"{BASE_URL}/product/{quote(MPN)}"
+    results = []
+    for size, filler_rows in PAGE_SIZES.items():
+        pages = {'search': search_page(MPN, filler_rows).encode('utf-8'),
+                 'product': product_page(MPN, filler_rows).encode('utf-8')}
+        for method, selectors in SELECTORS.items():
+            calls = {
+                'extract_link': ('search', lambda page: extract_link(page, method, selectors['link'], None, url), expected['link']),
+                'extract_data': ('product', lambda page: extract_data(page, method, selectors['family']), expected['family']),
+                'extract_image_links': ('product', lambda page: extract_image_links(page, method, selectors['images'], None, url),
+                                        expected['images']),
+            }
+            for extractor, (page_kind, call, want) in calls.items():
+                for input_kind in ('bytes', 'parsed'):
+                    page = pages[page_kind] if input_kind == 'bytes' else ParsedDocument(pages[page_kind], url)
+                    correct = call(page) == want
+                    seconds = time_call(lambda: call(page), target_seconds)
+                    results.append({'extractor': extractor, 'method': method, 'page_size': size,
+                                    'page_kb': round(len(pages[page_kind]) / 1024, 1), 'input': input_kind,
+                                    'us_per_call': seconds * 1e6, 'correct': correct})
+    return results
+
+
+def run_scenario(scenario, rows, folder):
+    """
+    Runs one end-to-end scenario through process_manufacturer() and checks every row it found.
+
+    The scenario is correct when no found row is wrong and at least its 'min_found' share
+    of rows (default all of them) was found.
+    """
+    identifiers = [f"MPN-{i:05d}" for i in range(rows)]
+    input_path = os.path.join(folder, f"{scenario['name']}.csv")
+    output_path = os.path.join(folder, f"{scenario['name']}_out.csv")
+    pd.DataFrame({'MPN': identifiers}).to_csv(input_path, index=False)
+    with MockSite(**scenario['site']) as site:
+        config = dict(site.config(), **COMMON_CONFIG)
+        config.update(scenario['config'])
+        with contextlib.redirect_stdout(io.StringIO()):  # retry messages
+            summary = process_manufacturer(input_path, config, output_path=output_path)
+        status_counts = dict(site.status_counts)
+    df = summary['dataframe']
+    incorrect = 0
+    for _, row in df.iterrows():
+        if pd.isna(row['Product Link']) or pd.isna(row['Family']):  # not found; checked against min_found below
+            continue
+        want = expected_result(row['MPN'], site.base_url)
+        images = [row[column] for column in df.columns if column.startswith("Image Link ") and pd.notna(row[column])]
+        if row['Product Link'] != want['link'] or row['Family'] != " > ".join(want['family']) or images != want['images']:
+            incorrect += 1
+    stages = summary['profile']['stages']
+    min_found = scenario.get('min_found', 1.0)
+    found_ratio = summary['ok'] / summary['rows'] if summary['rows'] else 0.0
+    return {
+        'name': scenario['name'],
+        'site': scenario['site'],
+        'config': scenario['config'],
+        'rows': summary['rows'],
+        'ok': summary['ok'],
+        'found_ratio': found_ratio,
+        'min_found': min_found,
+        'incorrect': incorrect,
+        'elapsed': summary['elapsed'],
+        'rows_per_sec': summary['rows'] / summary['elapsed'],
+        'http': summary['http'],
+        'retries': summary['retries'],
+        'server_statuses': {str(status): count for status, count in sorted(status_counts.items())},
+        'stages_ms': {stage: {'p50': timing['p50'] * 1000, 'p95': timing['p95'] * 1000}
+                      for stage, timing in stages.items()},
+        'correct': incorrect == 0 and summary['rows'] == rows and found_ratio >= min_found,
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'commit': commit,
+            'python': platform.python_version(), 'platform': platform.platform(), 'lxml': lxml.__version__,
+            'cpus': os.cpu_count()}
+
+
+def micro_key(result):
+    return f"{result['extractor']}/{result['method']}/{result['page_size']}/{result['input']}"
+
+
+def compare(current, baseline, max_slowdown):
+    """Prints the change against a previous results file. Returns the number of regressions beyond max_slowdown."""
+    pairs = []
+    old_micro = {micro_key(result): result['us_per_call'] for result in baseline.get('micro', [])}
+    for result in current['micro']:
+        if micro_key(result) in old_micro:
+            # Slowdown = new time / old time - 1
+            pairs.append((micro_key(result), old_micro[micro_key(result)], result['us_per_call'], 'us/call',
+                          result['us_per_call'] / old_micro[micro_key(result)] - 1))
+    old_scenarios = {result['name']: result for result in baseline.get('end_to_end', [])}
+    for result in current['end_to_end']:
+        old = old_scenarios.get(result['name'])
+        if old:
+            pairs.append((result['name'], old['rows_per_sec'], result['rows_per_sec'], 'rows/s',
+                          old['rows_per_sec'] / result['rows_per_sec'] - 1))
+            # Share of rows found, in percent; a drop counts like a slowdown
+            before, after = 100 * old['ok'] / old['rows'], 100 * result['ok'] / result['rows']
+            pairs.append((f"{result['name']}/found", before, after, '% found',
+                          before / after - 1 if after else float('inf')))
+    regressions = 0
+    print(f"\nCompared with {baseline['environment'].get('commit')} ({baseline['environment']['timestamp']}):")
+    print(f"{'benchmark':<44} {'before':>10} {'after':>10} {'unit':>8} {'slowdown':>9}")
+    for name, before, after, unit, slowdown in pairs:
+        flag = ""
+        if max_slowdown is not None and slowdown > max_slowdown:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{name:<44} {before:>10.1f} {after:>10.1f} {unit:>8} {slowdown:>+8.0%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    parser.add_argument("--compare", help="Results JSON of a previous run to compare against.")
+    parser.add_argument("--max-slowdown", type=float,
+                        help="Fail when a benchmark is more than this fraction slower than in --compare (e.g. 0.2).")
+    parser.add_argument("--rows", type=int, default=200, help="Identifiers per end-to-end scenario.")
+    parser.add_argument("--micro-seconds", type=float, default=0.1, help="Approximate timing budget per micro-benchmark round.")
+    parser.add_argument("--scenarios", nargs="+", choices=[scenario['name'] for scenario in SCENARIOS],
+                        help="Run only these end-to-end scenarios.")
+    parser.add_argument("--quick", action="store_true", help="Fewer rows and shorter timings, for a smoke run.")
+    args = parser.parse_args()
+    if args.quick:
+        args.rows = min(args.rows, 40)
+        args.micro_seconds = min(args.micro_seconds, 0.01)
+
+    results = {'environment': environment(), 'micro': run_micro(args.micro_seconds), 'end_to_end': []}
+    print(f"{'extractor':<20} {'method':>6} {'page':>6} {'input':>7} {'us/call':>10} {'ok':>4}")
+    for result in results['micro']:
+        print(f"{result['extractor']:<20} {result['method']:>6} {result['page_size']:>6} {result['input']:>7} "
+              f"{result['us_per_call']:>10.1f} {'yes' if result['correct'] else 'NO':>4}")
+
+    print(f"\n{'scenario':<28} {'rows':>5} {'ok':>5} {'wrong':>5} {'rows/s':>8} {'retries':>8} {'conns':>6} {'pass':>5}")
+    with tempfile.TemporaryDirectory() as folder:
+        for scenario in SCENARIOS:
+            if args.scenarios and scenario['name'] not in args.scenarios:
+                continue
+            result = run_scenario(scenario, args.rows, folder)
+            results['end_to_end'].append(result)
+            print(f"{result['name']:<28} {result['rows']:>5} {result['ok']:>5} {result['incorrect']:>5} "
+                  f"{result['rows_per_sec']:>8.1f} {result['retries']['retries']:>8} {result['http']['connections_opened']:>6} "
+                  f"{'yes' if result['correct'] else 'NO':>5}")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to '{args.output}'")
+
+    failed = [micro_key(result) for result in results['micro'] if not result['correct']]
+    failed += [result['name'] for result in results['end_to_end'] if not result['correct']]
+    if failed:
+        print(f"\nExtraction or found-row checks failed: {', '.join(failed)}")
+    regressions = 0
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.max_slowdown)
+    return 1 if failed or regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+"""
+A local stand-in for a manufacturer website, used by the benchmarks.
+
+Serves synthetic search result pages at /search?q={mpn} and product pages at
+/product/{mpn}, with an optional artificial latency per request, bandwidth
+limit, page padding, and a share of requests answered with 5xx errors or
+429 Too Many Requests (with Retry-After).
+"""
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, quote
+
+SEARCH_PAGE = """<html><head><title>Search: {mpn}</title></head><body>
+<div class="results">
+<a class="product-link" href="/product/{quoted}">{mpn}</a>
+{filler}</div>
+</body></html>"""
+
+SEARCH_FILLER_ROW = ('<div class="result"><a class="related-link" href="/product/{quoted}-R{i}">{mpn}-R{i}</a>'
+                     '<p class="snippet">Related part {i}, <span>similar to {mpn}</span>, rated 50 V.</p></div>')
+
+PRODUCT_PAGE = """<html><head><title>{mpn}</title></head><body>
+<ul class="breadcrumb"><li>Products</li><li>Connectors</li><li>{mpn}</li></ul>
+<div class="gallery">
+<img class="product-image" src="/images/{quoted}-1.jpg">
+<img class="product-image" src="/images/{quoted}-2.jpg">
+</div>
+<table class="specs">{filler}</table>
+</body></html>"""
+
+FILLER_ROW = '<tr><td class="name">Attribute {i}</td><td class="value"><span>{i} mm</span> <em>typ.</em></td></tr>'
+
+
+def search_page(mpn, filler_rows=0):
+    """Returns the search results page for an identifier, with filler_rows further (non-matching) results after the first."""
+    quoted = quote(mpn)
+    filler = "".join(SEARCH_FILLER_ROW.format(mpn=mpn, quoted=quoted, i=i) for i in range(filler_rows))
+    return SEARCH_PAGE.format(mpn=mpn, quoted=quoted, filler=filler)
+
+
+def product_page(mpn, filler_rows=0):
+    """Returns the product page for an identifier, padded with filler_rows specification rows."""
+    filler = "".join(FILLER_ROW.format(i=i) for i in range(filler_rows))
+    return PRODUCT_PAGE.format(mpn=mpn, quoted=quote(mpn), filler=filler)
+
+
+class MockSiteHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The client closed the connection, e.g. after reading only part of a page
+
+    def do_GET(self):
+        server = self.server
+        time.sleep(server.latency + (server.random() * server.latency_jitter if server.latency_jitter else 0))
+        fault = server.random()
+        if fault < server.throttle_rate:
+            server.count(429)
+            self.send_response(429)
+            self.send_header("Retry-After", f"{server.retry_after:g}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if fault < server.throttle_rate + server.error_rate:
+            server.count(503)
+            self.send_error(503)
+            return
+        parsed = urlparse(self.path)
+        if parsed.path == "/search":
+            mpn = parse_qs(parsed.query).get("q", [""])[0]
+            body = search_page(mpn, self.server.search_filler_rows)
+        elif parsed.path.startswith("/product/"):
+            mpn = parsed.path[len("/product/"):]
+            body = product_page(mpn, self.server.filler_rows)
+        else:
+            server.count(404)
+            self.send_error(404)
+            return
+        payload = body.encode("utf-8")
+        etag = '"%s"' % hashlib.md5(payload).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            server.count(304)
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        server.count(200)
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        try:
+            if not self.server.bandwidth:
+                self.wfile.write(payload)
+                return
+            for start in range(0, len(payload), 16384):
+                self.wfile.write(payload[start:start + 16384])
+                self.wfile.flush()
+                time.sleep(16384 / self.server.bandwidth)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True  # The client stopped reading early
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockSite:
+    """
+    Runs the mock site on a background thread.
+
+    Args:
+        latency (float, optional): Seconds to wait before answering each request. Defaults to 0.05.
+        filler_rows (int, optional): Specification rows added to each product page. Defaults to 0.
+        search_filler_rows (int, optional): Extra results after the product link on each search page. Defaults to 0.
+        bandwidth (float, optional): Bytes per second each response is sent at. None means unlimited.
+        latency_jitter (float, optional): Up to this many extra seconds of random latency per request. Defaults to 0.
+        error_rate (float, optional): Share of requests answered with 503 Service Unavailable. Defaults to 0.
+        throttle_rate (float, optional): Share of requests answered with 429 Too Many Requests. Defaults to 0.
+        retry_after (float, optional): Seconds sent in the Retry-After header of 429 responses. Defaults to 1.
+        seed (int, optional): Seed for the latency jitter and fault injection, so runs are repeatable. Defaults to 0.
+    """
+
+    def __init__(self, latency=0.05, filler_rows=0, search_filler_rows=0, bandwidth=None, latency_jitter=0.0,
+                 error_rate=0.0, throttle_rate=0.0, retry_after=1, seed=0):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), MockSiteHandler)
+        self.server.daemon_threads = True
+        self.server.latency = latency
+        self.server.filler_rows = filler_rows
+        self.server.search_filler_rows = search_filler_rows
+        self.server.bandwidth = bandwidth
+        self.server.latency_jitter = latency_jitter
+        self.server.error_rate = error_rate
+        self.server.throttle_rate = throttle_rate
+        self.server.retry_after = retry_after
+        self.status_counts = {}
+        lock = threading.Lock()
+        rng = random.Random(seed)
+
+        def next_random():
+            with lock:
+                return rng.random()
+
+        def count(status):
+            with lock:
+                self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+        self.server.random = next_random
+        self.server.count = count
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def config(self):
+        """Returns a scraper configuration that targets this site."""
+        return {
+            'mpn_column': 'MPN',
+            'search_url_format': self.base_url + "/search?q={mpn}",
+            'product_link_selector': "//a[@class='product-link']",
+            'product_link_selector_type': 'xpath',
+            'family_selector': "//ul[@class='breadcrumb']/li",
+            'family_selector_type': 'xpath',
+            'image_selector': "//img[@class='product-image']/@src",
+            'image_selector_type': 'xpath',
+            'output_prefix': 'Product',
+        }
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()